@@ -0,0 +1,250 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from filters import ImageProcessor
+from filters.backend import Backend
+
+RESOLUTIONS = {
+    "480p": (640, 480),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "4K": (3840, 2160),
+}
+
+# Options for the combo-box settings; each one is benchmarked on its own
+MODE_OPTIONS = {
+    "pipeline": ["Vertical Split", "Horizontal Split", "Quad Mirror", "Radial Mirror",
+                 "Recursive Grid", "Time-Shifted Split", "RGB Channel Split", "Infinite Tunnel",
+                 "Checkerboard Mirror", "Kaleidoscope 8-way", "Scanline Interlace", "Glitch Grid",
+                 "Vertical Slit Scan", "Horizontal Slit Scan"],
+    "edge_mode": ["Canny", "Sobel", "Neon", "Comic Ink"],
+    "sketch_mode": ["Pencil", "Charcoal"],
+    "halftone_mode": ["Dots"],
+    "optical_mode": ["Kaleidoscope", "Swirl", "Mirror Tiles"],
+    "look_mode": ["Sepia", "Cyberpunk", "Duotone", "Teal Orange"],
+    "dead_channel": ["Red", "Green", "Blue"],
+    "geometry_mode": ["Mosaic", "ASCII"],
+    "texture_mode": ["Oil", "Watercolor"],
+}
+
+# Representative "on" values for sliders that go beyond 0/1 in the GUI
+SLIDER_VALUES = {
+    "contrast": 1.5, "saturation": 1.5, "blur": 3, "pixelate": 8,
+    "glitch_rgb_split": 5, "glitch_jitter": 20, "glitch_block_shift": 50, "vhs_noise": 50,
+    "pixel_sort": 50, "film_grain": 20, "vignette": 50, "bloom": 50,
+    "motion_trail": 5, "time_smear": 50, "temporal_echo": 10, "freeze_cells": 50,
+    "memory_burn": 50, "temp_feedback": 50, "time_jitter": 30, "temp_quantize": 10,
+    "color_collapse": 50, "hue_shatter": 12, "bit_rot": 50, "palette_decay": 50,
+    "solarize_hell": 50, "color_bleeding": 50, "chromatic_meltdown": 50, "hue_feedback": 10,
+    "comp_artifacts": 50, "row_desync": 50, "packet_loss": 50, "datamosh_still": 50,
+    "buffer_overrun": 50, "pixel_gravity": 10, "reality_tear": 20, "recursive_zoom": 50,
+    "voronoi_dest": 50, "non_euclidean": 20, "pixel_erosion": 3, "fracture_glass": 20,
+    "folding_space": 3, "edge_overload": 3, "visual_tinnitus": 50, "frame_erosion": 50,
+    "time_warp_vortex": 50, "camera_amnesia": 30, "gpu_blur": 5, "gpu_warp": 50,
+}
+
+# Settings that only modify another effect and are never benchmarked alone
+MODIFIERS = {"color_depth", "edge_thresh", "optical_amount", "slit_scan_angle",
+             "halftone_cell", "mosaic_cell", "ascii_cell", "ascii_charset",
+             "sort_key", "sort_axis"}
+
+PRESETS = {
+    "vhs_tape": {"glitch_rgb_split": 4, "glitch_jitter": 10, "vhs_noise": 30, "film_grain": 10},
+    "ghost_trail": {"motion_trail": 5, "ghosting": 1, "bloom": 30},
+    "datamosh": {"comp_artifacts": 60, "datamosh_still": 30, "row_desync": 10},
+    "sketchbook": {"sketch_mode": "Pencil", "vignette": 40},
+    "time_smear": {"time_smear": 70, "temporal_echo": 10, "hue_feedback": 5},
+    "neon_swirl": {"edge_mode": "Neon", "optical_mode": "Swirl", "optical_amount": 30, "saturation": 1.5},
+    "surveillance": {"look_mode": "Duotone", "pixelate": 4, "vignette": 60, "glitch_jitter": 5},
+}
+
+def effect_cases():
+    defaults = ImageProcessor().settings
+    cases = []
+    for key, value in defaults.items():
+        if key in MODIFIERS:
+            continue
+        if key in MODE_OPTIONS:
+            for mode in MODE_OPTIONS[key]:
+                settings = {key: mode}
+                if key == "optical_mode":
+                    settings["optical_amount"] = 30
+                cases.append((f"{key}={mode}", settings))
+        elif isinstance(value, bool):
+            cases.append((key, {key: True}))
+        else:
+            cases.append((key, {key: SLIDER_VALUES.get(key, 1)}))
+    return cases
+
+def synthetic_frames(width, height, count=8):
+    # Moving gradient with shapes and mild noise, so temporal effects see motion
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    frames = []
+    for i in range(count):
+        frame = np.empty((height, width, 3), dtype=np.uint8)
+        frame[..., 0] = (x + i * 8) % 256
+        frame[..., 1] = y
+        frame[..., 2] = (x[::-1] + y) / 2
+        radius = max(4, height // 8)
+        center = (int(width * (0.2 + 0.6 * i / count)), height // 2)
+        cv2.circle(frame, center, radius, (255, 255, 255), -1)
+        cv2.rectangle(frame, (width // 10, height // 10), (width // 4, height // 3), (0, 0, 0), -1)
+        noise = rng.integers(0, 16, frame.shape, dtype=np.uint8)
+        frames.append(cv2.add(frame, noise))
+    return frames
+
+def recorded_frames(path, width, height, count=8):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA))
+    cap.release()
+    if not frames:
+        raise IOError(f"No frames read from {path}")
+    return frames
+
+def measure(settings, frames, warmup, iterations, max_seconds, memory_frames, use_opencl=True):
+    processor = ImageProcessor()
+    processor.backend.set_opencl(use_opencl)
+    processor.settings.update(settings)
+    n = len(frames)
+    for i in range(warmup):
+        processor.process(frames[i % n])
+
+    times = []
+    processor.backend.reset_counters()
+    deadline = time.perf_counter() + max_seconds
+    for i in range(iterations):
+        start = time.perf_counter()
+        processor.process(frames[(warmup + i) % n])
+        times.append(time.perf_counter() - start)
+        if time.perf_counter() > deadline:
+            break
+
+    transfers = processor.backend.uploads + processor.backend.downloads
+
+    # Separate short pass for memory, tracemalloc slows allocation-heavy code
+    tracemalloc.start()
+    for i in range(memory_frames):
+        processor.process(frames[i % n])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times = np.array(times) * 1000.0
+    mean = float(times.mean())
+    return {
+        "frames": len(times),
+        "ms_per_frame": mean,
+        "ms_median": float(np.median(times)),
+        "ms_p95": float(np.percentile(times, 95)),
+        "fps": 1000.0 / mean if mean > 0 else float("inf"),
+        "peak_mem_mb": peak / (1024 * 1024),
+        "transfers_per_frame": transfers / len(times),
+    }
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {(r["case"], r["resolution"], r["source"]): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        old = previous.get((r["case"], r["resolution"], r["source"]))
+        if old is None or "error" in r or "error" in old:
+            continue
+        change = r["ms_per_frame"] / old["ms_per_frame"] - 1.0
+        if change > threshold:
+            regressions.append((r, old, change))
+    for r, old, change in regressions:
+        print(f"REGRESSION {r['case']} @ {r['resolution']} ({r['source']}): "
+              f"{old['ms_per_frame']:.2f} -> {r['ms_per_frame']:.2f} ms (+{change * 100:.0f}%)")
+    print(f"{len(regressions)} regression(s) above {threshold * 100:.0f}% against {baseline_path}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every ArtCam effect and a set of presets.")
+    parser.add_argument("-r", "--resolutions", default=",".join(RESOLUTIONS),
+                        help="comma-separated subset of " + ", ".join(RESOLUTIONS))
+    parser.add_argument("-k", "--filter", action="append", default=[],
+                        help="only run cases whose name contains this text (repeatable)")
+    parser.add_argument("--effects-only", action="store_true", help="skip the presets")
+    parser.add_argument("--presets-only", action="store_true", help="skip the single-effect cases")
+    parser.add_argument("--video", help="also benchmark on frames from this recording")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--max-seconds", type=float, default=5.0, help="time budget per case")
+    parser.add_argument("--memory-frames", type=int, default=3)
+    parser.add_argument("--no-opencl", action="store_true", help="run the UMat paths on the CPU")
+    parser.add_argument("-o", "--output", help="write results as JSON")
+    parser.add_argument("--compare", help="results JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.15, help="slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+    backend = Backend(use_opencl=not args.no_opencl)
+
+    cases = []
+    if not args.presets_only:
+        cases += [(name, "effect", settings) for name, settings in effect_cases()]
+    if not args.effects_only:
+        cases += [(name, "preset", settings) for name, settings in PRESETS.items()]
+    if args.filter:
+        cases = [c for c in cases if any(f in c[0] for f in args.filter)]
+
+    results = []
+    for res_name in args.resolutions.split(","):
+        width, height = RESOLUTIONS[res_name]
+        sources = {"synthetic": synthetic_frames(width, height)}
+        if args.video:
+            sources["recorded"] = recorded_frames(args.video, width, height)
+        for source, frames in sources.items():
+            for name, kind, settings in cases:
+                result = {"case": name, "kind": kind, "resolution": res_name, "source": source,
+                          "settings": settings}
+                try:
+                    stats = measure(settings, frames, args.warmup, args.iterations,
+                                    args.max_seconds, args.memory_frames, backend.opencl)
+                except Exception as e:
+                    # Keep going: a broken effect should not hide the others
+                    result["error"] = f"{type(e).__name__}: {e}"
+                    results.append(result)
+                    print(f"{res_name:>5} {source:<9} {name:<36} FAILED {result['error'].splitlines()[0]}", flush=True)
+                    continue
+                result.update(stats)
+                results.append(result)
+                print(f"{res_name:>5} {source:<9} {name:<36} {stats['ms_per_frame']:9.2f} ms "
+                      f"{stats['fps']:8.1f} fps {stats['peak_mem_mb']:8.1f} MB", flush=True)
+
+    if args.output:
+        report = {
+            "meta": {
+                "date": datetime.datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "opencv": cv2.__version__,
+                "numpy": np.__version__,
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "opencl": backend.opencl,
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
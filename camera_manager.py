@@ -1,3 +1,5 @@
+import threading
+import time
 import cv2
 import numpy as np
 try:
@@ -5,9 +7,107 @@ try:
 except ImportError:
     pyvirtualcam = None
 
+class ThreadedCapture:
+    """Runs VideoCapture.read on its own thread into a latest-frame slot.
+
+    The capture thread decodes into a back buffer and publishes it as the
+    latest frame. read() takes the latest frame and holds it for the caller
+    until the next read(), when it goes back to the pool of back buffers,
+    so frames are reused without being overwritten while in use.
+
+    With the "drop_oldest" policy an unread frame is replaced by a newer one
+    and counted as dropped; with "block" the capture thread waits until the
+    consumer has taken the previous frame.
+    """
+
+    POLICIES = ("drop_oldest", "block")
+
+    def __init__(self, cap, policy="drop_oldest"):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown capture policy: {policy}")
+        self.cap = cap
+        self.policy = policy
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.read_failures = 0
+        self.last_timestamp = None
+        self._cond = threading.Condition()
+        self._latest = None
+        self._latest_time = None
+        self._held = None
+        self._spare = []
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="capture", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while self._running:
+            with self._cond:
+                buf = self._spare.pop() if self._spare else None
+            ret, buf = self.cap.read(buf)
+            timestamp = time.monotonic()
+            if not ret:
+                self.read_failures += 1
+                time.sleep(0.01)
+                continue
+
+            with self._cond:
+                if self.policy == "block":
+                    while self._latest is not None and self._running:
+                        self._cond.wait(0.1)
+                    if not self._running:
+                        break
+                if self._latest is not None:
+                    self._spare.append(self._latest)
+                    self.frames_dropped += 1
+                self._latest = buf
+                self._latest_time = timestamp
+                self.frames_captured += 1
+                self.last_timestamp = timestamp
+                self._cond.notify_all()
+
+    def read(self, timeout=0.0):
+        """Return (frame, capture timestamp) or (None, None) if no new frame arrived."""
+        with self._cond:
+            if self._latest is None and timeout:
+                self._cond.wait_for(lambda: self._latest is not None or not self._running, timeout)
+            if self._latest is None:
+                return None, None
+            if self._held is not None:
+                self._spare.append(self._held)
+            self._held = self._latest
+            self._latest = None
+            self._cond.notify_all()
+            return self._held, self._latest_time
+
+    def stats(self):
+        return {
+            "captured": self.frames_captured,
+            "dropped": self.frames_dropped,
+            "read_failures": self.read_failures,
+            "last_timestamp": self.last_timestamp,
+        }
+
 class CameraManager:
-    def __init__(self):
+    def __init__(self, threaded=False, policy="drop_oldest"):
         self.cap = None
+        self.threaded = threaded
+        self.policy = policy
+        self.capture = None
+        self.last_frame = None
+        self.last_timestamp = None
 
     @staticmethod
     def list_cameras(max_to_test=5):
@@ -20,15 +120,31 @@ class CameraManager:
         return available_cameras
 
     def open_camera(self, index):
-        if self.cap is not None:
-            self.cap.release()
+        self.release()
         self.cap = cv2.VideoCapture(index)
+        if self.threaded and self.cap.isOpened():
+            self.capture = ThreadedCapture(self.cap, self.policy)
+            self.capture.start()
         return self.cap.isOpened()
 
-    def get_frame(self):
-        if self.cap is not None and self.cap.isOpened():
-            ret, frame = self.cap.read()
+    def get_frame(self, timeout=0.0, new_only=False):
+        # open_camera() may swap these from another thread; read them once
+        capture, cap = self.capture, self.cap
+        if capture is not None:
+            # Freshest frame from the capture thread, or the last one again
+            frame, timestamp = capture.read(timeout)
+            if frame is not None:
+                self.last_frame = frame
+                self.last_timestamp = timestamp
+                return frame
+            if new_only and capture.frames_captured:
+                return None
+            if self.last_frame is not None:
+                return self.last_frame
+        elif cap is not None and cap.isOpened():
+            ret, frame = cap.read()
             if ret:
+                self.last_timestamp = time.monotonic()
                 return frame
         
         # Fallback: Generate a test pattern if no camera is available
@@ -36,48 +152,121 @@ class CameraManager:
         cv2.putText(test_frame, "No Camera Feed - Test Pattern", (50, 240),
                     cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
         # Add some moving element to see filters like 'average'
-        import time
         t = time.time()
         x = int(320 + 200 * np.cos(t))
         y = int(240 + 150 * np.sin(t))
         cv2.circle(test_frame, (x, y), 50, (0, 255, 0), -1)
         return test_frame
 
+    def stats(self):
+        capture = self.capture
+        return capture.stats() if capture is not None else None
+
     def release(self):
+        if self.capture is not None:
+            self.capture.stop()
+            self.capture = None
+        self.last_frame = None
         if self.cap is not None:
             self.cap.release()
 
 class VirtualCameraManager:
-    def __init__(self):
+    """Sends frames to a virtual camera from its own thread.
+
+    send_frame() only drops the frame into a single-slot mailbox and
+    returns; a frame that is still waiting when the next one arrives is
+    replaced and counted as dropped. The sink thread converts to RGB,
+    scales to the camera size in reused buffers and paces itself with
+    sleep_until_next_frame(), so the caller never waits on the device.
+    The caller must not modify a frame after passing it in.
+
+    backend defaults to pyvirtualcam; any module-like object with a
+    compatible Camera(width=, height=, fps=) works, e.g. a fake in tests.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else pyvirtualcam
         self.cam = None
         self.width = 0
         self.height = 0
+        self.frames_delivered = 0
+        self.frames_dropped = 0
+        self.send_failures = 0
+        self._cond = threading.Condition()
+        self._pending = None
+        self._running = False
+        self._thread = None
+        self._scaled = None
+        self._rgb = None
 
     def start(self, width, height, fps=30):
-        if pyvirtualcam is None:
+        self.stop()
+        if self.backend is None:
             print("pyvirtualcam not installed. Virtual camera disabled.")
             return False
         
         try:
-            self.cam = pyvirtualcam.Camera(width=width, height=height, fps=fps)
+            self.cam = self.backend.Camera(width=width, height=height, fps=fps)
             self.width = width
             self.height = height
             print(f"Virtual camera started: {self.cam.device}")
-            return True
         except Exception as e:
             print(f"Failed to start virtual camera: {e}")
             return False
 
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="vcam", daemon=True)
+        self._thread.start()
+        return True
+
     def send_frame(self, frame):
-        if self.cam is not None:
-            # pyvirtualcam expects RGB
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            if frame_rgb.shape[1] != self.width or frame_rgb.shape[0] != self.height:
-                frame_rgb = cv2.resize(frame_rgb, (self.width, self.height))
-            self.cam.send(frame_rgb)
+        with self._cond:
+            if not self._running:
+                return
+            if self._pending is not None:
+                self.frames_dropped += 1
+            self._pending = frame
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and self._running:
+                    self._cond.wait()
+                if not self._running:
+                    break
+                frame = self._pending
+                self._pending = None
+
+            # pyvirtualcam expects RGB at the camera size
+            if frame.shape[1] != self.width or frame.shape[0] != self.height:
+                self._scaled = cv2.resize(frame, (self.width, self.height), dst=self._scaled)
+                frame = self._scaled
+            self._rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
+            try:
+                self.cam.send(self._rgb)
+            except Exception as e:
+                self.send_failures += 1
+                print(f"Virtual camera send failed: {e}")
+                continue
+            self.frames_delivered += 1
             self.cam.sleep_until_next_frame()
 
+    def stats(self):
+        return {
+            "delivered": self.frames_delivered,
+            "dropped": self.frames_dropped,
+            "send_failures": self.send_failures,
+        }
+
     def stop(self):
+        with self._cond:
+            self._running = False
+            self._pending = None
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
         if self.cam is not None:
             self.cam.close()
             self.cam = None
@@ -0,0 +1,12 @@
+import numpy as np
+
+# Float accumulators that persist across frames (smear, burn-in, feedback,
+# average reality) are shown as uint8 through a buffer reused every frame.
+
+def to_uint8(acc, out=None):
+    """acc truncated to uint8 like acc.astype(np.uint8), written into out
+    when it has the right shape so the buffer is reused every frame."""
+    if out is None or out.shape != acc.shape:
+        out = np.empty(acc.shape, dtype=np.uint8)
+    np.copyto(out, acc, casting="unsafe")
+    return out
@@ -0,0 +1,66 @@
+import cv2
+import numpy as np
+
+class Backend:
+    """Where the frame lives between stages: a host ndarray or a cv2.UMat.
+
+    Device stages (DEVICE_STAGES in the execution plan) take and return
+    either kind, so process() hands them the frame as it is and a run of
+    them keeps it on the OpenCL device. Host stages always get an ndarray.
+    Every conversion goes through upload() or download(), which count
+    frames moved each way; a run of device stages costs one of each.
+    process() calls end_frame() after every frame, and frame_transfers()
+    gives what the last frame moved.
+
+    UMat code also runs without OpenCL, on the CPU, so the device paths
+    work the same with OpenCL disabled (use_opencl=False) or on a CPU
+    runtime such as POCL.
+    """
+
+    def __init__(self, use_opencl=None):
+        self.uploads = 0
+        self.downloads = 0
+        self.shape = None
+        self._marks = (0, 0)
+        self._last_frame = (0, 0)
+        if use_opencl is not None:
+            self.set_opencl(use_opencl)
+        self.opencl = cv2.ocl.useOpenCL()
+
+    def set_opencl(self, enabled):
+        """Turn OpenCL on or off for all of cv2, if there is a device."""
+        cv2.ocl.setUseOpenCL(bool(enabled) and cv2.ocl.haveOpenCL())
+        self.opencl = cv2.ocl.useOpenCL()
+
+    def upload(self, frame):
+        if isinstance(frame, cv2.UMat):
+            return frame
+        self.uploads += 1
+        self.shape = frame.shape
+        return cv2.UMat(frame)
+
+    def download(self, frame):
+        if not isinstance(frame, cv2.UMat):
+            return frame
+        self.downloads += 1
+        return frame.get()
+
+    def frame_shape(self, frame):
+        """Shape of an ndarray or UMat frame. A UMat does not expose its
+        size, so device stages must keep the size of the frame they got."""
+        return frame.shape if isinstance(frame, np.ndarray) else self.shape
+
+    def transfers(self):
+        return {"uploads": self.uploads, "downloads": self.downloads}
+
+    def end_frame(self):
+        marks = (self.uploads, self.downloads)
+        self._last_frame = (marks[0] - self._marks[0], marks[1] - self._marks[1])
+        self._marks = marks
+
+    def frame_transfers(self):
+        return {"uploads": self._last_frame[0], "downloads": self._last_frame[1]}
+
+    def reset_counters(self):
+        self.uploads = self.downloads = 0
+        self._marks = self._last_frame = (0, 0)
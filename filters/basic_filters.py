@@ -1,11 +1,49 @@
 import cv2
 import numpy as np
 
+from .cell_render import render_dots, render_mosaic, render_ascii, charset
+from .color_lut import ColorChain, ramp, add_cube, cube_looks
+
+# Heavy local filters run through processor.tiles with these halos, the
+# distance each one reads beyond a pixel that still changes its output.
+def _comic_color(tile):
+    return cv2.bilateralFilter(tile, 9, 300, 300)
+
+def _pencil(tile):
+    return cv2.pencilSketch(tile, sigma_s=60, sigma_r=0.07, shade_factor=0.05)[0]
+
+def _oil(tile):
+    return cv2.xphoto.oilPainting(tile, 7, 1) if hasattr(cv2, 'xphoto') else cv2.stylization(tile, sigma_s=60, sigma_r=0.07)
+
+def _watercolor(tile):
+    return cv2.stylization(tile, sigma_s=60, sigma_r=0.45)
+
+COMIC_HALO = 5
+PENCIL_HALO = 24
+OIL_HALO = 8
+# cv2.stylization's recursive filter has no fixed reach, so any halo leaves
+# seams: Watercolor, and Oil without xphoto, run on the full frame
+OIL_TILED = hasattr(cv2, 'xphoto')
+
+# Fixed colour looks as ColorChain curves and transforms
+SEPIA = np.array([[0.272, 0.534, 0.131],
+                  [0.349, 0.686, 0.168],
+                  [0.393, 0.769, 0.189]])
+INVERT = ramp(cv2.bitwise_not)
+CYBERPUNK_TINT = ramp(lambda img: cv2.add(img, (30, 0, 50, 0)))
+
+def _cyberpunk_saturation(hsv):
+    hsv = hsv.astype(np.float32)
+    hsv[:,:,1] *= 1.5
+    return hsv.astype(np.uint8)
+
+CYBERPUNK_SATURATION = ramp(_cyberpunk_saturation)
+
 def apply_edges(frame, processor):
     mode = processor.settings["edge_mode"]
     if mode == "None": return frame
     
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    gray = processor.frame_ctx.gray()
     if mode == "Canny":
         edges = cv2.Canny(gray, processor.settings["edge_thresh"], processor.settings["edge_thresh"]*2)
         return cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR)
@@ -24,7 +62,7 @@ def apply_edges(frame, processor):
     elif mode == "Comic Ink":
         gray = cv2.medianBlur(gray, 5)
         edges = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY, 9, 9)
-        color = cv2.bilateralFilter(frame, 9, 300, 300)
+        color = processor.tiles.run(_comic_color, frame, COMIC_HALO)
         return cv2.bitwise_and(color, color, mask=edges)
     return frame
 
@@ -33,10 +71,10 @@ def apply_sketch(frame, processor):
     if mode == "None": return frame
     
     if mode == "Pencil":
-        gray, sketch = cv2.pencilSketch(frame, sigma_s=60, sigma_r=0.07, shade_factor=0.05)
+        gray = processor.tiles.run(_pencil, frame, PENCIL_HALO)
         return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
     elif mode == "Charcoal":
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray = processor.frame_ctx.gray()
         inverted = 255 - gray
         blurred = cv2.GaussianBlur(inverted, (21, 21), 0)
         sketch = cv2.divide(gray, 255 - blurred, scale=256)
@@ -46,46 +84,22 @@ def apply_sketch(frame, processor):
 def apply_halftone(frame, processor):
     mode = processor.settings["halftone_mode"]
     if mode == "None": return frame
-    h, w = frame.shape[:2]
     
     if mode == "Dots":
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        res = np.full((h, w, 3), 255, dtype=np.uint8)
-        step = 10
-        for y in range(0, h, step):
-            for x in range(0, w, step):
-                roi = gray[y:y+step, x:x+step]
-                avg = np.mean(roi)
-                radius = int((255 - avg) / 255 * (step / 2))
-                if radius > 0:
-                    cv2.circle(res, (x + step//2, y + step//2), radius, (0, 0, 0), -1)
-        return res
+        gray = processor.frame_ctx.gray()
+        dots = render_dots(gray, processor.settings["halftone_cell"])
+        return cv2.cvtColor(dots, cv2.COLOR_GRAY2BGR)
     return frame
 
 def apply_geometry(frame, processor):
     mode = processor.settings["geometry_mode"]
     if mode == "None": return frame
-    h, w = frame.shape[:2]
     
     if mode == "Mosaic":
-        p = 20
-        res = frame.copy()
-        for y in range(0, h, p):
-            for x in range(0, w, p):
-                color = np.mean(frame[y:y+p, x:x+p], axis=(0, 1))
-                cv2.rectangle(res, (x, y), (x+p, y+p), color, -1)
-                cv2.rectangle(res, (x, y), (x+p, y+p), (0, 0, 0), 1)
-        return res
+        return render_mosaic(frame, processor.settings["mosaic_cell"])
     elif mode == "ASCII":
-        chars = "@%#*+=-:. "
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        small = cv2.resize(gray, (w//10, h//10))
-        res = np.zeros((h, w, 3), dtype=np.uint8)
-        for y in range(small.shape[0]):
-            for x in range(small.shape[1]):
-                char = chars[int(small[y, x] / 256 * len(chars))]
-                cv2.putText(res, char, (x*10, y*10), cv2.FONT_HERSHEY_SIMPLEX, 0.3, (0, 255, 0), 1)
-        return res
+        gray = processor.frame_ctx.gray()
+        return render_ascii(gray, processor.settings["ascii_cell"], charset(processor.settings["ascii_charset"]))
     return frame
 
 def apply_texture(frame, processor):
@@ -93,9 +107,9 @@ def apply_texture(frame, processor):
     if mode == "None": return frame
     
     if mode == "Oil":
-        return cv2.xphoto.oilPainting(frame, 7, 1) if hasattr(cv2, 'xphoto') else cv2.stylization(frame, sigma_s=60, sigma_r=0.07)
+        return processor.tiles.run(_oil, frame, OIL_HALO) if OIL_TILED else _oil(frame)
     elif mode == "Watercolor":
-        return cv2.stylization(frame, sigma_s=60, sigma_r=0.45)
+        return _watercolor(frame)
     return frame
 
 def apply_light(frame, processor):
@@ -111,12 +125,14 @@ def apply_light(frame, processor):
         for i in range(3):
             vignette[:,:,i] = vignette[:,:,i] * mask
         processed = cv2.addWeighted(processed, 1 - processor.settings["vignette"]/100, vignette, processor.settings["vignette"]/100, 0)
+        processor.profiler.lap("vignette")
         
     if processor.settings["bloom"] > 0:
         mask = cv2.threshold(cv2.cvtColor(processed, cv2.COLOR_BGR2GRAY), 200, 255, cv2.THRESH_BINARY)[1]
         mask = cv2.cvtColor(mask, cv2.COLOR_GRAY2BGR)
         bloom = cv2.GaussianBlur(mask, (25, 25), 0)
         processed = cv2.addWeighted(processed, 1, bloom, processor.settings["bloom"]/100, 0)
+        processor.profiler.lap("bloom")
         
     return processed
 
@@ -124,25 +140,54 @@ def apply_looks(frame, processor):
     mode = processor.settings["look_mode"]
     processed = frame.copy()
     
+    colors = ColorChain(processor.profiler)
     if mode == "Sepia":
-        kernel = np.array([[0.272, 0.534, 0.131],
-                          [0.349, 0.686, 0.168],
-                          [0.393, 0.769, 0.189]])
-        processed = cv2.transform(processed, kernel)
+        colors.transform("Sepia", lambda img: cv2.transform(img, SEPIA))
     elif mode == "Cyberpunk":
-        hsv = cv2.cvtColor(processed, cv2.COLOR_BGR2HSV).astype(np.float32)
-        hsv[:,:,1] *= 1.5
-        processed = cv2.cvtColor(hsv.astype(np.uint8), cv2.COLOR_HSV2BGR)
-        b, g, r = cv2.split(processed)
-        r = cv2.add(r, 50)
-        b = cv2.add(b, 30)
-        processed = cv2.merge([b, g, r])
+        colors.curve("Cyberpunk", CYBERPUNK_SATURATION, "HSV")
+        colors.curve("Cyberpunk", CYBERPUNK_TINT)
     elif mode == "Duotone":
         gray = cv2.cvtColor(processed, cv2.COLOR_BGR2GRAY)
         processed = cv2.applyColorMap(gray, cv2.COLORMAP_JET)
+    elif mode != "None":
+        path = cube_looks().get(mode)
+        if path:
+            add_cube(colors, mode, path)
+    processed = colors.apply(processed)
         
     if processor.settings["film_grain"] > 0:
-        noise = np.random.normal(0, processor.settings["film_grain"], frame.shape).astype(np.uint8)
+        noise = processor.noise.normal(frame.shape, processor.settings["film_grain"])
         processed = cv2.add(processed, noise)
+        processor.profiler.lap("film_grain")
+        
+    return processed
+
+def _scale_hls(hls, contrast, saturation):
+    hls = hls.astype(np.float32)
+    hls[:, :, 1] *= contrast
+    hls[:, :, 2] *= saturation
+    return np.clip(hls, 0, 255).astype(np.uint8)
+
+def apply_basic(frame, processor):
+    colors = ColorChain(processor.profiler)
+    if processor.settings["invert"]:
+        colors.curve("invert", INVERT, fn=cv2.bitwise_not)
+        
+    if processor.settings["contrast"] != 1.0 or processor.settings["saturation"] != 1.0:
+        contrast, saturation = processor.settings["contrast"], processor.settings["saturation"]
+        colors.curve("contrast", ramp(lambda hls: _scale_hls(hls, contrast, saturation)), "HLS")
+    frame = colors.apply(frame)
+        
+    if processor.settings["blur"] > 0:
+        k = processor.settings["blur"] * 2 + 1
+        frame = cv2.GaussianBlur(frame, (k, k), 0)
+        processor.profiler.lap("blur")
+        
+    if processor.settings["pixelate"] > 1:
+        h, w = processor.backend.frame_shape(frame)[:2]
+        p = processor.settings["pixelate"]
+        small = cv2.resize(frame, (max(1, w//p), max(1, h//p)), interpolation=cv2.INTER_LINEAR)
+        frame = cv2.resize(small, (w, h), interpolation=cv2.INTER_NEAREST)
+        processor.profiler.lap("pixelate")
         
-    return processed
\ No newline at end of file
+    return frame
\ No newline at end of file
@@ -0,0 +1,90 @@
+import cv2
+import numpy as np
+
+# Grid effects treat a frame as rows x cols blocks of bs x bs pixels. The
+# last row and column of blocks may be partial; helpers either pad them by
+# repeating the border (pad/blocks/unpad), or keep each partial block within
+# its own extent where padding would show (flip_blocks/shift_blocks).
+
+def grid_shape(h, w, bs):
+    return -(-h // bs), -(-w // bs)
+
+def pad(img, bs):
+    """img grown to whole blocks by repeating its last row/column (no copy if it fits)."""
+    h, w = img.shape[:2]
+    rows, cols = grid_shape(h, w, bs)
+    if rows * bs == h and cols * bs == w:
+        return img
+    return cv2.copyMakeBorder(img, 0, rows * bs - h, 0, cols * bs - w, cv2.BORDER_REPLICATE)
+
+def blocks(padded, bs):
+    """(rows, cols, bs, bs, C) view of a padded image; writes go through."""
+    h, w = padded.shape[:2]
+    return padded.reshape(h // bs, bs, w // bs, bs, -1).swapaxes(1, 2)
+
+def unpad(padded, h, w):
+    return padded[:h, :w]
+
+def expand(mask, bs, h, w):
+    """Block-level (rows, cols) mask as an (h, w) uint8 pixel mask."""
+    rows, cols = mask.shape
+    return cv2.resize(mask.astype(np.uint8), (cols * bs, rows * bs), interpolation=cv2.INTER_NEAREST)[:h, :w]
+
+def copy_blocks(dst, src, mask, bs):
+    """Copy the blocks where mask is set from src into dst, in place."""
+    h, w = dst.shape[:2]
+    cv2.copyTo(src, expand(mask, bs, h, w), dst)
+
+def pixels(img):
+    """Flat view of a contiguous image with one element per pixel."""
+    return img.reshape(-1).view(np.dtype((np.void, img[0, 0].nbytes)))
+
+def chunks(padded, bs):
+    """(H, cols) view of a padded image with one bs-pixel row segment per element."""
+    segment = np.dtype((np.void, padded[0, :bs].nbytes))
+    return padded.reshape(padded.shape[0], -1).view(segment)
+
+def flip_blocks(img, bs, mask):
+    """Mirror the blocks where mask is set left to right, each within its own width."""
+    h, w = img.shape[:2]
+    padded = np.ascontiguousarray(pad(img, bs))
+    # Flipping the whole frame mirrors every block but also reverses their
+    # order along the row, so block j takes segment cols - 1 - j of it
+    mirrored = chunks(cv2.flip(padded, 1), bs)[:, ::-1]
+    out = padded.copy()
+    rows = np.repeat(mask, bs, axis=0)[:padded.shape[0]]
+    chunks(out, bs)[rows] = mirrored[rows]
+    out = unpad(out, h, w)
+    # A partial last column would pull in padding; mirror it within its width
+    x0 = (mask.shape[1] - 1) * bs
+    if w - x0 != bs:
+        rows = np.repeat(mask[:, -1], bs)[:h]
+        out[rows, x0:] = img[rows, x0:][:, ::-1]
+    return out
+
+def shift_blocks(img, bs, shifts):
+    """Roll blocks horizontally by their entry in shifts (rows, cols),
+    wrapping inside the block like np.roll on that block alone."""
+    h, w = img.shape[:2]
+    out = np.ascontiguousarray(pad(img, bs)).copy()
+    rows, cols = np.nonzero(shifts)
+    if len(rows):
+        # Source column inside each shifted block; padding columns stay put
+        x = np.arange(bs)
+        width = np.minimum(bs, w - cols * bs)[:, None]
+        from_x = np.where(x < width, (x - shifts[rows, cols][:, None]) % width, x)
+        # Flat pixel indices of just those blocks, (n, bs, bs)
+        row_start = ((rows * bs)[:, None] + x)[:, :, None] * out.shape[1] + (cols * bs)[:, None, None]
+        flat = pixels(out)
+        flat[row_start + x] = flat[row_start + from_x[:, None, :]]
+    return unpad(out, h, w)
+
+def permute_blocks(img, bs, order):
+    """Rearrange whole blocks: output block i (row-major) is input block order[i].
+    Partial edge blocks are padded, so a block moved to the edge is cropped."""
+    h, w = img.shape[:2]
+    padded = pad(img, bs)
+    rows, cols = grid_shape(h, w, bs)
+    grid = blocks(padded, bs).reshape(rows * cols, bs, bs, -1)[order]
+    out = grid.reshape(rows, cols, bs, bs, -1).swapaxes(1, 2).reshape(padded.shape)
+    return unpad(out, h, w)
@@ -0,0 +1,74 @@
+import cv2
+import numpy as np
+from functools import lru_cache
+
+# Character ramps from darkest to brightest cell. The ascii_charset setting
+# is one of these names or a literal ramp.
+ASCII_CHARSETS = {
+    "Classic": "@%#*+=-:. ",
+    "Dense": "$@B%8&WM#*oahkbdpqwmZO0QLCJUYXzcvunxrjft/|()1{}[]?-_+~<>i!lI;:,^`'. ",
+    "Blocks": "#=-. ",
+    "Binary": "10",
+}
+
+def charset(name):
+    return ASCII_CHARSETS.get(name, name) or ASCII_CHARSETS["Classic"]
+
+def cell_means(img, cell):
+    """Average of every cell x cell block, the last row/column of cells
+    padded by repeating the border. Returns (means, rows, cols)."""
+    h, w = img.shape[:2]
+    rows, cols = -(-h // cell), -(-w // cell)
+    if rows * cell != h or cols * cell != w:
+        img = cv2.copyMakeBorder(img, 0, rows * cell - h, 0, cols * cell - w, cv2.BORDER_REPLICATE)
+    return cv2.resize(img, (cols, rows), interpolation=cv2.INTER_AREA), rows, cols
+
+def tile_atlas(atlas, index, h, w):
+    """Assemble one sprite per cell, atlas[index[r, c]], into an h x w image."""
+    rows, cols = index.shape
+    cell = atlas.shape[1]
+    sprites = atlas[index]
+    out = sprites.swapaxes(1, 2).reshape((rows * cell, cols * cell) + atlas.shape[3:])
+    return out[:h, :w]
+
+@lru_cache(maxsize=8)
+def disc_atlas(cell):
+    # One black disc on white per radius 0..cell/2, as cv2.circle draws it
+    radii = int(cell / 2) + 1
+    atlas = np.full((radii, cell, cell), 255, dtype=np.uint8)
+    for radius in range(1, radii):
+        cv2.circle(atlas[radius], (cell // 2, cell // 2), radius, 0, -1)
+    return atlas
+
+@lru_cache(maxsize=8)
+def glyph_atlas(chars, cell):
+    # Glyph masks sitting on the bottom of their cell, font scaled to the cell
+    scale = 0.3 * cell / 10
+    atlas = np.zeros((len(chars), cell, cell), dtype=np.uint8)
+    for i, char in enumerate(chars):
+        cv2.putText(atlas[i], char, (0, cell - 1), cv2.FONT_HERSHEY_SIMPLEX, scale, 255, 1)
+    return atlas
+
+def render_dots(gray, cell):
+    h, w = gray.shape
+    means, _, _ = cell_means(gray, cell)
+    radius = ((255 - means.astype(np.float32)) / 255 * (cell / 2)).astype(np.intp)
+    return tile_atlas(disc_atlas(cell), radius, h, w)
+
+def render_mosaic(frame, cell):
+    h, w = frame.shape[:2]
+    means, rows, cols = cell_means(frame, cell)
+    out = cv2.resize(means, (cols * cell, rows * cell), interpolation=cv2.INTER_NEAREST)[:h, :w]
+    out[::cell] = 0
+    out[:, ::cell] = 0
+    return out
+
+def render_ascii(gray, cell, chars):
+    h, w = gray.shape
+    means, _, _ = cell_means(gray, cell)
+    index = (means.astype(np.intp) * len(chars)) // 256
+    mask = tile_atlas(glyph_atlas(chars, cell), index, h, w)
+    # Green text on black
+    out = np.zeros((h, w, 3), dtype=np.uint8)
+    out[..., 1] = mask
+    return out
@@ -0,0 +1,263 @@
+import os
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+# Point-wise colour effects are queued on a ColorChain and applied together.
+# A curve maps each channel through its own 256-entry table in BGR, HSV, HLS
+# or LAB. BGR curves compose exactly, so they merge with each other and with
+# the curves one effect makes in another space into a single pass; curves of
+# different effects in HSV, HLS or LAB keep their own round trip, which
+# quantises to BGR in between.
+# Transforms (any other per-pixel function of the colour) run as passes of
+# their own. 3D .cube looks are resampled onto a lattice with LUT_BITS bits
+# per channel and looked up per pixel; the resampled tables are kept in an
+# LRU cache until the file changes.
+LUT_BITS = 7
+MAX_CACHED_TABLES = 4
+LUT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "luts")
+
+SPACES = {
+    "HSV": (cv2.COLOR_BGR2HSV, cv2.COLOR_HSV2BGR),
+    "HLS": (cv2.COLOR_BGR2HLS, cv2.COLOR_HLS2BGR),
+    "LAB": (cv2.COLOR_BGR2LAB, cv2.COLOR_LAB2BGR),
+}
+
+IDENTITY = np.repeat(np.arange(256, dtype=np.uint8)[:, None], 3, axis=1)
+# Index of the lattice level closest to each channel value. At 7 bits that
+# is just the top bits, so lookup() only needs the table at other depths.
+NEAREST_LEVEL = np.rint(np.arange(256) * (((1 << LUT_BITS) - 1) / 255.0)).astype(np.uint8)
+ROUNDS_BY_SHIFT = (NEAREST_LEVEL == np.arange(256) >> (8 - LUT_BITS)).all()
+
+_cache = OrderedDict()
+_broken = set()
+
+def ramp(fn):
+    """Curve of a per-channel function, found by running fn on a 1x256 image
+    holding every value once in each channel."""
+    return np.ascontiguousarray(fn(IDENTITY.reshape(1, 256, 3).copy()).reshape(256, 3), dtype=np.uint8)
+
+def channel_curve(channel, table):
+    """Curve that maps one channel through table and leaves the others alone."""
+    curve = IDENTITY.copy()
+    curve[:, channel] = table
+    return curve
+
+def solarize(img, thresh):
+    """Invert every pixel whose gray value is above thresh (works on UMat too)."""
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    _, below = cv2.threshold(gray, thresh, 255, cv2.THRESH_BINARY_INV)
+    return cv2.copyTo(img, below, cv2.bitwise_not(img))
+
+def _compose(first, then):
+    return then[first, np.arange(3)]
+
+def _lut(img, curve, owned=False):
+    """cv2.LUT with the cheapest table layout for curve: one shared table,
+    or only the channel that changes. owned images may be written in place."""
+    changed = np.flatnonzero((curve != IDENTITY).any(axis=0))
+    if len(changed) == 0:
+        return img
+    if (curve == curve[:, :1]).all():
+        return cv2.LUT(img, np.ascontiguousarray(curve[:, 0]))
+    if len(changed) == 1 and isinstance(img, np.ndarray):
+        c = int(changed[0])
+        plane = cv2.LUT(cv2.extractChannel(img, c), np.ascontiguousarray(curve[:, c]))
+        return cv2.insertChannel(plane, img if owned else img.copy(), c)
+    return cv2.LUT(img, curve.reshape(1, 256, 3))
+
+def _sandwich(ops):
+    """(before, space, curve, after) if ops are curves whose non-BGR ones
+    all come from one effect, are in one space and are consecutive, else
+    None."""
+    spaces = [op[1] for op in ops]
+    if None in spaces:
+        return None
+    inner = [i for i, space in enumerate(spaces) if space != "BGR"]
+    if inner and (len({(spaces[i], ops[i][0]) for i in inner}) > 1 or inner[-1] - inner[0] + 1 != len(inner)):
+        return None
+    start, stop = (inner[0], inner[-1] + 1) if inner else (len(ops), len(ops))
+    parts = []
+    for run in (ops[:start], ops[start:stop], ops[stop:]):
+        curve = None
+        for op in run:
+            curve = op[2] if curve is None else _compose(curve, op[2])
+        parts.append(curve)
+    return parts[0], spaces[start] if inner else None, parts[1], parts[2]
+
+def _segments(ops):
+    """Split ops into the fewest passes that are each exact: single
+    transforms, and runs of curves that _sandwich accepts."""
+    segments = []
+    for op in ops:
+        if segments and op[1] is not None and _sandwich(segments[-1] + [op]) is not None:
+            segments[-1].append(op)
+        else:
+            segments.append([op])
+    return segments
+
+def _pass(ops):
+    if len(ops) == 1 and ops[0][3] is not None:
+        return ops[0][3]
+    before, space, curve, after = _sandwich(ops)
+    def apply(src):
+        img = src
+        if before is not None:
+            img = _lut(img, before)
+        if space is not None:
+            to_space, to_bgr = SPACES[space]
+            img = cv2.cvtColor(_lut(cv2.cvtColor(img, to_space), curve, owned=True), to_bgr)
+        if after is not None:
+            img = _lut(img, after, owned=img is not src)
+        return img
+    return apply
+
+def lookup(img, table):
+    """Map every pixel of a BGR image through a 3D table (packed BGRA words,
+    index r << 2 * LUT_BITS | g << LUT_BITS | b), taking each channel to the
+    nearest lattice level."""
+    h, w = img.shape[:2]
+    shift, mask = 8 - LUT_BITS, np.uint32((1 << LUT_BITS) - 1)
+    if not ROUNDS_BY_SHIFT:
+        img, shift = cv2.LUT(img, NEAREST_LEVEL), 0
+    packed = cv2.cvtColor(img, cv2.COLOR_BGR2BGRA).view(np.uint32)[:, :, 0]
+    index = (packed >> shift) & mask
+    index |= (packed >> (8 + shift - LUT_BITS)) & (mask << LUT_BITS)
+    index |= (packed >> (16 + shift - 2 * LUT_BITS)) & (mask << 2 * LUT_BITS)
+    return cv2.cvtColor(table.take(index).view(np.uint8).reshape(h, w, 4), cv2.COLOR_BGRA2BGR)
+
+def _table(key, build):
+    table = _cache.get(key)
+    if table is None:
+        table = _cache[key] = build()
+        if len(_cache) > MAX_CACHED_TABLES:
+            _cache.popitem(last=False)
+    else:
+        _cache.move_to_end(key)
+    return table
+
+def compile_chain(ops):
+    """Functions applying ops in order to a BGR image, one per pass."""
+    return [_pass(segment) for segment in _segments(ops)]
+
+class ColorChain:
+    """Queue of colour effects for one stage.
+
+    Effects add themselves with curve() or transform() and the stage calls
+    apply() on its frame before anything that is not a point-wise colour
+    effect, so the order of effects is kept and the output is what separate
+    passes would give.
+    """
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.ops = []
+
+    def curve(self, name, curve, space="BGR", fn=None):
+        """curve is (256, 3) uint8, one column per channel of space. fn may
+        compute the same thing directly, for when the curve ends up as a
+        pass of its own."""
+        self.ops.append((name, space, curve, fn))
+
+    def transform(self, name, fn):
+        """fn maps a BGR image to a BGR image pixel by pixel."""
+        self.ops.append((name, None, None, fn))
+
+    def apply(self, img):
+        if not self.ops:
+            return img
+        for run in compile_chain(self.ops):
+            img = run(img)
+        self.profiler.lap("+".join(dict.fromkeys(op[0] for op in self.ops)))
+        self.ops = []
+        return img
+
+# .cube looks (the Adobe/Resolve text format). 3D cubes are resampled once
+# onto the lattice of 1 << LUT_BITS levels per channel with trilinear
+# interpolation; 1D cubes become curves.
+
+def cube_looks():
+    """Look name -> path for every .cube file in LUT_DIR."""
+    if not os.path.isdir(LUT_DIR):
+        return {}
+    return {os.path.splitext(f)[0]: os.path.join(LUT_DIR, f)
+            for f in sorted(os.listdir(LUT_DIR)) if f.lower().endswith(".cube")}
+
+def parse_cube(path):
+    """(size, is_3d, rows, domain_min, domain_max); rows are RGB floats,
+    red changing fastest."""
+    size, is_3d, rows = None, True, []
+    lo, hi = np.zeros(3), np.ones(3)
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if not parts or parts[0].startswith("#"):
+                continue
+            word = parts[0].upper()
+            if word in ("LUT_3D_SIZE", "LUT_1D_SIZE"):
+                size, is_3d = int(parts[1]), word == "LUT_3D_SIZE"
+            elif word == "DOMAIN_MIN":
+                lo = np.array(parts[1:4], dtype=np.float64)
+            elif word == "DOMAIN_MAX":
+                hi = np.array(parts[1:4], dtype=np.float64)
+            elif word[0].isdigit() or word[0] in "-.":
+                rows.append(parts[:3])
+    if size is None:
+        raise ValueError(f"{path}: missing LUT_3D_SIZE or LUT_1D_SIZE")
+    rows = np.array(rows, dtype=np.float64)
+    if len(rows) != (size ** 3 if is_3d else size):
+        raise ValueError(f"{path}: expected {size ** 3 if is_3d else size} entries, found {len(rows)}")
+    return size, is_3d, rows, lo, hi
+
+def _to_uint8(rgb):
+    return np.clip(np.rint(rgb * 255.0), 0, 255).astype(np.uint8)[..., ::-1]
+
+def _resample_cube(size, rows, lo, hi):
+    # Trilinear interpolation on a grid is separable: weight the cube's
+    # entries along each axis with an (n, size) matrix, two taps per row
+    n = 1 << LUT_BITS
+    levels = np.rint(np.arange(n) * (255.0 / (n - 1))) / 255.0
+    weights = []
+    for c in range(3):
+        pos = np.clip((levels - lo[c]) / (hi[c] - lo[c]), 0, 1) * (size - 1)
+        base = np.minimum(pos.astype(np.intp), size - 2)
+        w = np.zeros((n, size))
+        w[np.arange(n), base] = 1 - (pos - base)
+        w[np.arange(n), base + 1] = pos - base
+        weights.append(w)
+    cube = rows.reshape(size, size, size, 3)  # [b, g, r]
+    rgb = np.einsum("Rr,Gg,Bb,bgrc->RGBc", *weights, cube, optimize=True)
+    bgr = _to_uint8(rgb).reshape(1, -1, 3)
+    return cv2.cvtColor(bgr, cv2.COLOR_BGR2BGRA).view(np.uint32).reshape(-1)
+
+def load_cube(path):
+    """("curve", curve) for a 1D cube, ("table", table) for a 3D one; cached
+    until the file changes."""
+    def build():
+        size, is_3d, rows, lo, hi = parse_cube(path)
+        if is_3d:
+            return "table", _resample_cube(size, rows, lo, hi)
+        x = np.arange(256) / 255.0
+        grid = np.linspace(lo, hi, size)
+        rgb = np.stack([np.interp(x, grid[:, c], rows[:, c]) for c in range(3)], axis=1)
+        return "curve", np.ascontiguousarray(_to_uint8(rgb))
+    return _table(("cube", path, os.path.getmtime(path)), build)
+
+def add_cube(chain, name, path):
+    """Queue the look in path on chain; a file that fails to load is reported
+    once and skipped until it changes."""
+    stamp = (path, None)
+    try:
+        stamp = (path, os.path.getmtime(path))
+        if stamp in _broken:
+            return
+        kind, data = load_cube(path)
+    except (OSError, ValueError) as e:
+        _broken.add(stamp)
+        print(f"Could not load look {name}: {e}")
+        return
+    if kind == "curve":
+        chain.curve(name, data)
+    else:
+        chain.transform(name, lambda img: lookup(img, data))
@@ -0,0 +1,123 @@
+from collections import namedtuple
+
+from .pipeline_filters import apply_pipeline
+from .basic_filters import apply_edges, apply_sketch, apply_halftone, apply_geometry, apply_texture, apply_light, apply_looks, apply_basic
+from .glitch_filters import apply_glitch, apply_optical
+from .temporal_filters import apply_temporal, apply_temporal_abuse
+from .destructive_filters import apply_destructive_color, apply_digital_violence
+from .spatial_filters import apply_spatial_chaos
+from .perception_filters import apply_perception_weirdness
+from .hybrid_filters import apply_hybrids
+from .minimalism_filters import apply_minimalism
+from .performance_filters import apply_performance_art
+from .gpu_filters import apply_gpu_accelerated
+from .frame_history import needs_history, record_history
+
+# Stage families in processing order, with the settings that switch them on.
+STAGES = [
+    ("pipeline", apply_pipeline, ("pipeline",)),
+    ("temporal", apply_temporal, ("motion_trail", "ghosting")),
+    ("temporal_abuse", apply_temporal_abuse, (
+        "time_smear", "temporal_echo", "time_slice", "reverse_aging", "freeze_cells",
+        "memory_burn", "temp_feedback", "time_jitter", "slit_scan", "temp_quantize")),
+    ("destructive_color", apply_destructive_color, (
+        "color_collapse", "hue_shatter", "bit_rot", "palette_decay", "solarize_hell",
+        "color_bleeding", "chromatic_meltdown", "hue_feedback", "dead_channel")),
+    ("digital_violence", apply_digital_violence, (
+        "comp_artifacts", "row_desync", "packet_loss", "res_thrashing", "macroblock_shuffle",
+        "sync_loss", "datamosh_still", "buffer_overrun", "corrupted_header")),
+    ("spatial_chaos", apply_spatial_chaos, (
+        "pixel_gravity", "reality_tear", "recursive_zoom", "voronoi_dest", "non_euclidean",
+        "pixel_erosion", "fracture_glass", "spatial_feedback", "folding_space")),
+    ("perception", apply_perception_weirdness, (
+        "motion_hallucination", "impossible_colors", "edge_overload", "depth_inversion",
+        "face_ghosting", "pareidolia_booster", "visual_tinnitus", "afterimage_trap")),
+    ("hybrids", apply_hybrids, (
+        "time_delayed_mirrors", "motion_fossils", "temp_blur_field", "chrono_pixel_sort",
+        "frame_erosion", "event_horizon", "time_warp_vortex")),
+    ("minimalism", apply_minimalism, (
+        "single_pixel", "average_reality", "color_census", "entropy_maximizer",
+        "camera_amnesia", "reality_quantizer", "noise_wins")),
+    ("performance_art", apply_performance_art, (
+        "surveillance_degradation", "attention_punisher", "observer_effect",
+        "machine_fatigue", "digital_death", "resurrection_loop")),
+    ("gpu", apply_gpu_accelerated, (
+        "gpu_blur", "gpu_canny", "gpu_bilateral", "gpu_warp", "gpu_punch", "gpu_edge_glow",
+        "gpu_dream", "gpu_posterize", "gpu_chromatic", "gpu_solarize", "gpu_ghosting",
+        "gpu_color_cycle", "gpu_block_glitch", "gpu_radial_blur", "gpu_infrared")),
+    ("optical", apply_optical, ("optical_mode",)),
+    ("glitch", apply_glitch, (
+        "glitch_rgb_split", "glitch_jitter", "glitch_block_shift", "vhs_noise", "pixel_sort")),
+    ("edges", apply_edges, ("edge_mode",)),
+    ("sketch", apply_sketch, ("sketch_mode",)),
+    ("halftone", apply_halftone, ("halftone_mode",)),
+    ("geometry", apply_geometry, ("geometry_mode",)),
+    ("looks", apply_looks, ("look_mode", "film_grain")),
+    ("light", apply_light, ("vignette", "bloom")),
+    ("texture", apply_texture, ("texture_mode",)),
+    ("basic", apply_basic, ("invert", "contrast", "saturation", "blur", "pixelate")),
+]
+
+# Values that leave a setting switched off; anything else falsy or "None" is off too.
+INACTIVE_VALUES = {
+    "pipeline": "Area Scan",
+    "contrast": 1.0,
+    "saturation": 1.0,
+    "pixelate": 1,
+}
+
+# Settings whose output depends on earlier frames, buffers carried between
+# frames or the wall clock. Chains without them can be rendered out of order.
+STATEFUL_PIPELINES = ("Time-Shifted Split", "Scanline Interlace", "Vertical Slit Scan", "Horizontal Slit Scan")
+STATEFUL_SETTINGS = frozenset((
+    "motion_trail", "ghosting",
+    "time_smear", "temporal_echo", "time_slice", "reverse_aging", "freeze_cells",
+    "memory_burn", "temp_feedback", "time_jitter", "slit_scan", "temp_quantize",
+    "hue_feedback", "sync_loss", "datamosh_still", "pixel_gravity", "voronoi_dest", "spatial_feedback",
+    "motion_hallucination", "afterimage_trap",
+    "time_delayed_mirrors", "motion_fossils", "temp_blur_field", "chrono_pixel_sort",
+    "frame_erosion", "event_horizon", "time_warp_vortex",
+    "average_reality", "camera_amnesia", "noise_wins",
+    "surveillance_degradation", "attention_punisher", "observer_effect",
+    "machine_fatigue", "digital_death", "resurrection_loop",
+    "gpu_ghosting", "gpu_color_cycle",
+))
+
+# Stages that take and return cv2.UMat frames as well as ndarrays, so that a
+# run of them keeps the frame on the OpenCL device (see backend.Backend).
+DEVICE_STAGES = frozenset(("gpu", "optical", "basic"))
+
+Step = namedtuple("Step", ["name", "fn", "keys", "device"])
+
+def is_active(settings, key):
+    value = settings[key]
+    if key in INACTIVE_VALUES:
+        return value != INACTIVE_VALUES[key]
+    return value not in (0, "None")
+
+class ExecutionPlan:
+    """The stage families that are switched on for one settings snapshot."""
+
+    def __init__(self, steps, needs_history, stateful):
+        self.steps = steps
+        self.needs_history = needs_history
+        self.stateful = stateful
+
+    def __iter__(self):
+        return iter(self.steps)
+
+    def __len__(self):
+        return len(self.steps)
+
+def compile_plan(settings):
+    steps = []
+    history = needs_history(settings)
+    for name, fn, keys in STAGES:
+        active = tuple(key for key in keys if is_active(settings, key))
+        if active:
+            steps.append(Step(name, fn, active, name in DEVICE_STAGES))
+        if name == "pipeline" and history:
+            steps.append(Step("history", record_history, (), False))
+    stateful = history or settings["pipeline"] in STATEFUL_PIPELINES or any(
+        key in STATEFUL_SETTINGS for step in steps for key in step.keys)
+    return ExecutionPlan(steps, history, stateful)
@@ -0,0 +1,57 @@
+import cv2
+
+class FrameContext:
+    """Planes derived from the frame a stage was given, computed on first use.
+
+    process() calls start() once per frame with the previous output and
+    bind() before every stage with that stage's input. Binding a different
+    frame drops everything memoized for the old one. Device stages may get
+    a UMat, so they are bound to None and must not use the context. Stages copy their
+    input before drawing on it, so the planes stay valid for the whole
+    stage, but they describe the input only: a block that needs the planes
+    of its partly processed frame converts that frame itself.
+
+    Returned planes are shared between effects and must not be modified.
+    """
+
+    def __init__(self):
+        self.frame = None
+        self.prev = None
+        self.planes = {}
+
+    def start(self, prev):
+        self.frame = None
+        self.prev = prev
+        self.planes.clear()
+
+    def bind(self, frame):
+        if frame is not self.frame:
+            self.frame = frame
+            self.planes.clear()
+
+    def _plane(self, key, make):
+        assert self.frame is not None, "no frame bound: device stages cannot use the frame context"
+        plane = self.planes.get(key)
+        if plane is None:
+            plane = self.planes[key] = make()
+        return plane
+
+    def gray(self):
+        return self._plane("gray", lambda: cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY))
+
+    def has_prev(self):
+        """Whether there is a previous output of the same size to diff against."""
+        assert self.frame is not None, "no frame bound: device stages cannot use the frame context"
+        return self.prev is not None and self.prev.shape == self.frame.shape
+
+    def diff(self):
+        """absdiff of the stage input against the previous output."""
+        return self._plane("diff", lambda: cv2.absdiff(self.frame, self.prev))
+
+    def diff_gray(self):
+        return self._plane("diff_gray", lambda: cv2.cvtColor(self.diff(), cv2.COLOR_BGR2GRAY))
+
+    def motion_mask(self, threshold):
+        """255 where the grayscale diff is above threshold, 0 elsewhere."""
+        return self._plane(("motion", threshold), lambda: cv2.threshold(
+            self.diff_gray(), threshold, 255, cv2.THRESH_BINARY)[1])
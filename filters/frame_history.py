@@ -0,0 +1,152 @@
+import cv2
+import numpy as np
+
+# Settings that read past frames; the history only fills while one is active.
+HISTORY_PIPELINES = ("Time-Shifted Split", "Scanline Interlace")
+HISTORY_SETTINGS = (
+    "motion_trail", "temporal_echo", "time_slice", "reverse_aging",
+    "time_jitter", "slit_scan", "time_delayed_mirrors", "time_warp_vortex",
+)
+
+def needs_history(settings):
+    if settings["pipeline"] in HISTORY_PIPELINES:
+        return True
+    return any(settings[key] for key in HISTORY_SETTINGS)
+
+def record_history(frame, processor):
+    processor.history.push(frame)
+    return frame
+
+class FrameHistory:
+    """Preallocated (N, H, W, 3) ring of the most recent frames.
+
+    ago(0) is the newest frame, ago(len - 1) the oldest one still held.
+    Returned frames are views into the ring and stay valid until the slot
+    is overwritten N pushes later.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.frames = None
+        self.head = -1
+        self.count = 0
+        self.total = 0
+
+    def __len__(self):
+        return self.count
+
+    def push(self, frame):
+        if self.frames is None or self.frames.shape[1:] != frame.shape:
+            self.frames = np.empty((self.capacity,) + frame.shape, dtype=np.uint8)
+            self.clear()
+        self.head = (self.head + 1) % self.capacity
+        np.copyto(self.frames[self.head], frame)
+        self.count = min(self.count + 1, self.capacity)
+        self.total += 1
+
+    def clear(self):
+        self.head = -1
+        self.count = 0
+
+    def slot(self, k):
+        return (self.head - k) % self.capacity
+
+    def slots(self, ages):
+        return (self.head - np.asarray(ages)) % self.capacity
+
+    def ago(self, k):
+        return self.frames[self.slot(k)]
+
+    def gather(self, ages):
+        """Stack the frames at the given ages into one (len(ages), H, W, 3) array."""
+        return self.frames[self.slots(ages)]
+
+    def gather_rows(self, ages):
+        """Row y of the result is row y of the frame ages[y] frames ago."""
+        return self.frames[self.slots(ages), np.arange(len(ages))]
+
+    def gather_columns(self, ages):
+        """Column x of the result is column x of the frame ages[x] frames ago."""
+        slots = self.slots(ages)
+        out = np.empty(self.frames.shape[1:], dtype=np.uint8)
+        # Neighbouring columns from the same frame are copied as one slice
+        edges = np.flatnonzero(np.diff(slots)) + 1
+        for start, end in zip(np.r_[0, edges], np.r_[edges, len(slots)]):
+            out[:, start:end] = self.frames[slots[start], :, start:end]
+        return out
+
+    def gather_pixels(self, slots, pixels):
+        """Pick frames[slots, y, x] per output position, with pixels holding
+        flat y * W + x indices. Returns a (*pixels.shape, 3) array."""
+        h, w = self.frames.shape[1:3]
+        # A 3-byte void view copies each BGR pixel in one go
+        flat = self.frames.reshape(-1, 3).view("V3").ravel()
+        picked = np.take(flat, slots * (h * w) + pixels)
+        return picked.view(np.uint8).reshape(pixels.shape + (3,))
+
+class RunningSum:
+    """float32 sum of the newest n frames of a FrameHistory.
+
+    Each update adds the frame just pushed and subtracts the one that fell
+    out of the window, so the cost does not depend on n. The sum is rebuilt
+    from the history whenever an update missed a push (history cleared,
+    effect switched off for a while) or n or the frame size changed.
+    """
+
+    def __init__(self):
+        self.sum = None
+        self.scratch = None
+        self.out = None
+        self.n = None
+        self.total = None
+
+    def in_sync(self, history, n):
+        return (self.sum is not None and self.n == n and self.total == history.total - 1
+                and len(history) > 1 and n < history.capacity
+                and self.sum.shape == history.frames.shape[1:])
+
+    def update(self, history, n):
+        if self.in_sync(history, n):
+            self.add(history, n)
+        else:
+            self.rebuild(history, n)
+            self.scratch = np.empty_like(self.sum)
+            self.out = np.empty(self.sum.shape, dtype=np.uint8)
+        self.n = n
+        self.total = history.total
+        return self.sum
+
+    def add(self, history, n):
+        cv2.accumulate(history.ago(0), self.sum)
+        if len(history) > n:
+            np.subtract(self.sum, history.ago(n), out=self.sum)
+
+    def rebuild(self, history, n):
+        count = min(len(history), n)
+        self.sum = np.sum(history.gather(np.arange(count)), axis=0, dtype=np.float32)
+
+    def average(self, weight):
+        """sum / weight truncated to uint8, in a buffer reused every frame."""
+        np.divide(self.sum, weight, out=self.scratch)
+        np.copyto(self.out, self.scratch, casting="unsafe")
+        return self.out
+
+class DecayingSum(RunningSum):
+    """Sum of the newest n frames weighted decay**age, updated recursively:
+    S = newest + decay * S - decay**n * (frame n ago)."""
+
+    def __init__(self, decay):
+        super().__init__()
+        self.decay = decay
+
+    def add(self, history, n):
+        np.multiply(self.sum, np.float32(self.decay), out=self.sum)
+        cv2.accumulate(history.ago(0), self.sum)
+        if len(history) > n:
+            np.multiply(history.ago(n), np.float32(self.decay ** n), out=self.scratch)
+            np.subtract(self.sum, self.scratch, out=self.sum)
+
+    def rebuild(self, history, n):
+        self.sum = np.zeros(history.frames.shape[1:], dtype=np.float32)
+        for i in range(min(len(history), n)):
+            self.sum += history.ago(i).astype(np.float32) * self.decay ** i
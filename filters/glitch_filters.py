@@ -1,6 +1,10 @@
 import cv2
 import numpy as np
 
+from .pixel_sort import axis_of, sort_intervals, sort_key
+from .row_shift import random_offsets, shift_rows
+from .warp_maps import warp
+
 def apply_glitch(frame, processor):
     processed = frame.copy()
     h, w = frame.shape[:2]
@@ -12,14 +16,15 @@ def apply_glitch(frame, processor):
         b = np.roll(b, shift, axis=1)
         r = np.roll(r, -shift, axis=1)
         processed = cv2.merge([b, g, r])
+        processor.profiler.lap("glitch_rgb_split")
         
     # Jitter
     jitter = processor.settings["glitch_jitter"]
     if jitter > 0:
-        for i in range(h):
-            if np.random.random() < 0.1:
-                processed[i] = np.roll(processed[i], np.random.randint(-jitter, jitter), axis=0)
-                
+        # About one row in ten slips sideways
+        shift_rows(processed, random_offsets(h, 0.1, -jitter, jitter))
+        processor.profiler.lap("glitch_jitter")
+        
     # Block Shift
     block = processor.settings["glitch_block_shift"]
     if block > 0:
@@ -30,22 +35,37 @@ def apply_glitch(frame, processor):
             bw = np.random.randint(10, block+10)
             shift_x = np.random.randint(-block, block)
             processed[by:by+bh, bx:bx+bw] = np.roll(processed[by:by+bh, bx:bx+bw], shift_x, axis=1)
+        processor.profiler.lap("glitch_block_shift")
     
     # VHS Noise
     if processor.settings["vhs_noise"] > 0:
-        noise = np.random.randint(0, 50, (h, w, 3), dtype=np.uint8)
+        noise = processor.noise.uniform((h, w, 3), 50)
         processed = cv2.addWeighted(processed, 0.9, noise, 0.1, 0)
         # Add some horizontal lines
-        for _ in range(3):
-            y = np.random.randint(0, h)
+        for y in processor.noise.rng.integers(0, h, 3):
             processed[y:y+2, :] = processed[y:y+2, :] * 0.5 + 128
+        processor.profiler.lap("vhs_noise")
+        
+    # Pixel Sort
+    if processor.settings["pixel_sort"] > 0:
+        # Runs of pixels brighter than the threshold are sorted by the key
+        brightness = sort_key(processed, "Luminance")
+        key = brightness
+        if processor.settings["sort_key"] != "Luminance":
+            key = sort_key(processed, processor.settings["sort_key"], processor.pixel_age_map)
+        mask = brightness >= 255 * (100 - processor.settings["pixel_sort"]) / 100.0
+        processed = sort_intervals(processed, key, mask, axis_of(processor.settings["sort_axis"]))
+        processor.profiler.lap("pixel_sort")
             
     return processed
 
 def apply_optical(frame, processor):
     mode = processor.settings["optical_mode"]
     if mode == "None": return frame
-    h, w = frame.shape[:2]
+    # Swirl also works on a UMat frame, the mirror modes slice arrays
+    if mode != "Swirl":
+        frame = processor.backend.download(frame)
+    h, w = processor.backend.frame_shape(frame)[:2]
     
     if mode == "Kaleidoscope":
         # Simple 4-way mirror
@@ -58,24 +78,8 @@ def apply_optical(frame, processor):
         return np.vstack((top, bottom))
     
     elif mode == "Swirl":
-        flex_x = np.zeros((h, w), np.float32)
-        flex_y = np.zeros((h, w), np.float32)
-        center_x, center_y = w // 2, h // 2
-        radius = min(w, h) // 2
         strength = processor.settings["optical_amount"] / 10.0
-        
-        for y in range(h):
-            for x in range(w):
-                dx, dy = x - center_x, y - center_y
-                distance = np.sqrt(dx**2 + dy**2)
-                if distance < radius:
-                    angle = np.arctan2(dy, dx) + strength * (radius - distance) / radius
-                    flex_x[y, x] = center_x + distance * np.cos(angle)
-                    flex_y[y, x] = center_y + distance * np.sin(angle)
-                else:
-                    flex_x[y, x] = x
-                    flex_y[y, x] = y
-        return cv2.remap(frame, flex_x, flex_y, cv2.INTER_LINEAR)
+        return warp(frame, "swirl", strength, shape=(h, w))
     
     elif mode == "Mirror Tiles":
         tile_w, tile_h = w // 4, h // 4
@@ -2,37 +2,38 @@ import cv2
 import numpy as np
 import time
 
+from .pixel_sort import axis_of, sort_key, sort_lines
+from .warp_maps import get_lookup
+
 def apply_hybrids(frame, processor):
     processed = frame.copy()
     h, w = frame.shape[:2]
     
     # Time-Delayed Mirrors
     if processor.settings["time_delayed_mirrors"] > 0:
-        if len(processor.time_buffer) > 30:
-            past = processor.time_buffer[-30]
+        if len(processor.history) > 30:
+            past = processor.history.ago(29)
             processed[:, :w//2] = past[:, :w//2]
+        processor.profiler.lap("time_delayed_mirrors")
             
     # Motion Fossils
     if processor.settings["motion_fossils"] > 0:
         if processor.fossil_buffer is None or processor.fossil_buffer.shape != frame.shape:
-            processor.fossil_buffer = np.zeros_like(frame, dtype=np.float32)
+            processor.fossil_buffer = np.zeros_like(frame)
         
-        if processor.prev_frame is not None and processor.prev_frame.shape == frame.shape:
-            diff = cv2.absdiff(frame, processor.prev_frame)
-            _, mask = cv2.threshold(cv2.cvtColor(diff, cv2.COLOR_BGR2GRAY), 30, 255, cv2.THRESH_BINARY)
-            mask_3ch = cv2.merge([mask]*3)
-            processor.fossil_buffer[mask_3ch > 0] = frame[mask_3ch > 0].astype(np.float32)
+        if processor.frame_ctx.has_prev():
+            cv2.copyTo(frame, processor.frame_ctx.motion_mask(30), processor.fossil_buffer)
         
-        processed = cv2.addWeighted(processed, 0.7, processor.fossil_buffer.astype(np.uint8), 0.3, 0)
+        processed = cv2.addWeighted(processed, 0.7, processor.fossil_buffer, 0.3, 0)
+        processor.profiler.lap("motion_fossils")
         
     # Temporal Blur Field
     if processor.settings["temp_blur_field"] > 0:
         if processor.pixel_age_map is None or processor.pixel_age_map.shape != (h, w):
             processor.pixel_age_map = np.zeros((h, w), dtype=np.float32)
         
-        if processor.prev_frame is not None and processor.prev_frame.shape == frame.shape:
-            diff = cv2.absdiff(frame, processor.prev_frame)
-            gray_diff = cv2.cvtColor(diff, cv2.COLOR_BGR2GRAY)
+        if processor.frame_ctx.has_prev():
+            gray_diff = processor.frame_ctx.diff_gray()
             processor.pixel_age_map[gray_diff < 20] += 1
             processor.pixel_age_map[gray_diff >= 20] = 0
             
@@ -41,22 +42,25 @@ def apply_hybrids(frame, processor):
         mask = np.clip(processor.pixel_age_map / 100.0, 0, 1)
         mask_3ch = cv2.merge([mask]*3)
         processed = (processed * (1 - mask_3ch) + blurred * mask_3ch).astype(np.uint8)
+        processor.profiler.lap("temp_blur_field")
         
     # Chrono-Pixel Sorting
     if processor.settings["chrono_pixel_sort"] > 0:
-        # Sort pixels in rows based on brightness if they are "old"
-        if processor.pixel_age_map is not None:
-            for i in range(h):
-                if np.mean(processor.pixel_age_map[i]) > 50:
-                    row = processed[i]
-                    processed[i] = row[np.argsort(np.mean(row, axis=1))]
+        # Sort the pixels of the lines that are "old" on average
+        age = processor.pixel_age_map
+        if age is not None and age.shape == (h, w):
+            axis = axis_of(processor.settings["sort_axis"])
+            key = sort_key(processed, processor.settings["sort_key"], age)
+            processed = sort_lines(processed, key, age.mean(axis=axis) > 50, axis)
+        processor.profiler.lap("chrono_pixel_sort")
                     
     # Frame Erosion
     if processor.settings["frame_erosion"] > 0:
         if processor.pixel_age_map is not None:
-            noise = np.random.randint(0, 256, (h, w, 3), dtype=np.uint8)
+            noise = processor.noise.uniform((h, w, 3))
             mask = processor.pixel_age_map > (100 - processor.settings["frame_erosion"])
             processed[mask] = noise[mask]
+        processor.profiler.lap("frame_erosion")
             
     # Event Horizon
     if processor.settings["event_horizon"] > 0:
@@ -67,30 +71,18 @@ def apply_hybrids(frame, processor):
         processor.event_horizon_mask[:, line_pos:] = 1
         if processor.prev_frame is not None and processor.prev_frame.shape == frame.shape:
             processed[processor.event_horizon_mask > 0] = processor.prev_frame[processor.event_horizon_mask > 0]
+        processor.profiler.lap("event_horizon")
             
     # Time-Warp Vortex
     if processor.settings["time_warp_vortex"] > 0:
-        flex_x = np.zeros((h, w), np.float32)
-        flex_y = np.zeros((h, w), np.float32)
-        center_x, center_y = w // 2, h // 2
-        for y in range(h):
-            for x in range(w):
-                dx, dy = x - center_x, y - center_y
-                dist = np.sqrt(dx**2 + dy**2)
-                angle = np.arctan2(dy, dx) + dist / 100.0 * (processor.settings["time_warp_vortex"] / 10.0)
-                flex_x[y, x] = center_x + dist * np.cos(angle)
-                flex_y[y, x] = center_y + dist * np.sin(angle)
-        
-        # Use frames from buffer based on distance to center
-        res = np.zeros_like(processed)
-        remapped = cv2.remap(processed, flex_x, flex_y, cv2.INTER_LINEAR)
-        for y in range(h):
-            for x in range(w):
-                dx, dy = x - center_x, y - center_y
-                dist = np.sqrt(dx**2 + dy**2)
-                idx = int(np.clip(dist / 10, 0, len(processor.time_buffer)-1))
-                if len(processor.time_buffer) > 0:
-                    res[y, x] = processor.time_buffer[-idx-1][int(flex_y[y, x])%h, int(flex_x[y, x])%w]
-        processed = res
+        history = processor.history
+        if len(history) > 0:
+            # Precomputed (age, pixel) table, one gather over the whole ring
+            ages, pixels, max_age = get_lookup("vortex_history", h, w, processor.settings["time_warp_vortex"] / 10.0)
+            slots = history.slots(np.minimum(np.arange(max_age + 1), len(history) - 1))
+            processed = history.gather_pixels(slots[ages], pixels)
+        else:
+            processed = np.zeros_like(processed)
+        processor.profiler.lap("time_warp_vortex")
         
     return processed
\ No newline at end of file
@@ -1,23 +1,17 @@
-import cv2
-import numpy as np
+import json
 import time
 
-from .pipeline_filters import apply_pipeline
-from .basic_filters import apply_edges, apply_sketch, apply_halftone, apply_geometry, apply_texture, apply_light, apply_looks
-from .glitch_filters import apply_glitch, apply_optical
-from .temporal_filters import apply_temporal, apply_temporal_abuse
-from .destructive_filters import apply_destructive_color, apply_digital_violence
-from .spatial_filters import apply_spatial_chaos
-from .perception_filters import apply_perception_weirdness
-from .hybrid_filters import apply_hybrids
-from .minimalism_filters import apply_minimalism
-from .performance_filters import apply_performance_art
-from .gpu_filters import apply_gpu_accelerated
+from .backend import Backend
+from .frame_history import FrameHistory, RunningSum, DecayingSum
+from .execution_plan import compile_plan
+from .frame_context import FrameContext
+from .noise import NoiseService
+from .profiler import StageProfiler
+from .tiling import TileScheduler
 
 class ImageProcessor:
     def __init__(self):
         self.prev_frame = None
-        self.motion_history = []
         self.start_time = time.time()
         
         # Filter settings
@@ -40,19 +34,23 @@ class ImageProcessor:
             
             # Halftone
             "halftone_mode": "None", # Dots, Dithering, CMYK
+            "halftone_cell": 10,
             
             # Glitch
             "glitch_rgb_split": 0,
             "glitch_jitter": 0,
             "glitch_block_shift": 0,
             "vhs_noise": 0,
+            "pixel_sort": 0, # 0-100, share of the brightness range that gets sorted
+            "sort_key": "Luminance", # Luminance, Hue, Age (also used by Chrono-Pixel Sort)
+            "sort_axis": "Rows", # Rows, Columns
             
             # Optical
             "optical_mode": "None", # Kaleidoscope, Mirror, Swirl, Pinch/Bulge
             "optical_amount": 0,
             
             # Color Looks
-            "look_mode": "None", # Duotone, Sepia, Cyberpunk
+            "look_mode": "None", # Duotone, Sepia, Cyberpunk or a .cube file in luts/
             "film_grain": 0,
             
             # Light & Depth
@@ -71,6 +69,7 @@ class ImageProcessor:
             "temp_feedback": 0,
             "time_jitter": 0,
             "slit_scan": 0,
+            "slit_scan_angle": 0, # 0 = columns (oldest left), 90 = rows (oldest top)
             "temp_quantize": 0,
             
             # Destructive Color
@@ -161,120 +160,103 @@ class ImageProcessor:
             
             # Geometry
             "geometry_mode": "None", # Mosaic, ASCII
+            "mosaic_cell": 20,
+            "ascii_cell": 10,
+            "ascii_charset": "Classic", # name from ASCII_CHARSETS or a dark-to-light ramp
             
             # Texture
             "texture_mode": "None" # Canvas, Watercolor, Oil
         }
 
         # State for temporal filters
-        self.time_buffer = []
         self.max_buffer_size = 120 # ~2 seconds at 60fps
+        self.history = FrameHistory(self.max_buffer_size)
+        self.trail_sum = RunningSum()
+        self.echo_sum = DecayingSum(0.7)
+        self.plan = None
+        self.plan_snapshot = None
+        self.profiler = StageProfiler()
+        self.tiles = TileScheduler()
+        self.noise = NoiseService()
+        self.backend = Backend()
+        self.frame_ctx = FrameContext()
         self.burn_in_buffer = None
+        self.burn_out = None
         self.frozen_cells = None
         self.frozen_mask = None
         self.feedback_buffer = None
         self.smear_buffer = None
+        self.smear_out = None
+        self.feedback_out = None
         self.quantized_frame = None
         self.frame_count = 0
         self.palette_mask = None
         self.hue_offset = 0
         self.gravity_buffer = None
+        self.gravity_mask = None
         self.voronoi_points = None
+        self.voronoi_velocity = None
+        self.voronoi_size = None
         self.fracture_shards = None
         self.spatial_feedback_buffer = None
         self.fossil_buffer = None
         self.pixel_age_map = None
         self.event_horizon_mask = None
         self.average_reality_buffer = None
+        self.average_reality_out = None
         self.amnesia_timer = time.time()
         self.session_start_time = time.time()
         self.death_buffer = None
         self.slit_scan_buffer = None
         self.slit_scan_pos = 0
+        self.slit_scan_ages = None
+        self.slit_scan_key = None
         self.gpu_ghost_buffer = None
+        self.gpu_ghost_shape = None
         self.gpu_hue_offset = 0
 
+    def load_settings(self, path):
+        with open(path) as f:
+            data = json.load(f)
+        unknown = sorted(set(data) - set(self.settings))
+        if unknown:
+            print(f"Ignoring unknown settings: {', '.join(unknown)}")
+        self.settings.update({k: v for k, v in data.items() if k in self.settings})
+
+    def save_settings(self, path):
+        with open(path, "w") as f:
+            json.dump(self.settings, f, indent=2)
+
+    def get_plan(self):
+        # Recompile only when some setting changed since the last frame
+        snapshot = tuple(self.settings.items())
+        if snapshot != self.plan_snapshot:
+            self.plan = compile_plan(self.settings)
+            self.plan_snapshot = snapshot
+            # Stages and effects that were switched off stop showing up
+            self.profiler.expire()
+            if not self.plan.needs_history:
+                self.history.clear()
+        return self.plan
+
     def process(self, frame):
-        # Pipeline
-        frame = apply_pipeline(frame, self)
-        
-        # Temporal
-        frame = apply_temporal(frame, self)
-        
-        # Temporal Abuse
-        frame = apply_temporal_abuse(frame, self)
-        
-        # Destructive Color
-        frame = apply_destructive_color(frame, self)
-        
-        # Digital Violence
-        frame = apply_digital_violence(frame, self)
-        
-        # Spatial Chaos
-        frame = apply_spatial_chaos(frame, self)
-        
-        # Perception Weirdness
-        frame = apply_perception_weirdness(frame, self)
-        
-        # Hybrids
-        frame = apply_hybrids(frame, self)
-        
-        # Minimalism
-        frame = apply_minimalism(frame, self)
-        
-        # Performance Art
-        frame = apply_performance_art(frame, self)
-        
-        # GPU Accelerated
-        frame = apply_gpu_accelerated(frame, self)
-        
-        # Optical
-        frame = apply_optical(frame, self)
-        
-        # Glitch
-        frame = apply_glitch(frame, self)
-        
-        # Edges
-        frame = apply_edges(frame, self)
-        
-        # Sketch
-        frame = apply_sketch(frame, self)
-        
-        # Halftone
-        frame = apply_halftone(frame, self)
-        
-        # Geometry
-        frame = apply_geometry(frame, self)
-        
-        # Looks
-        frame = apply_looks(frame, self)
-        
-        # Light
-        frame = apply_light(frame, self)
-        
-        # Texture
-        frame = apply_texture(frame, self)
-        
-        # Basic Filters (from before)
-        if self.settings["invert"]:
-            frame = cv2.bitwise_not(frame)
-            
-        if self.settings["contrast"] != 1.0 or self.settings["saturation"] != 1.0:
-            hls = cv2.cvtColor(frame, cv2.COLOR_BGR2HLS).astype(np.float32)
-            hls[:, :, 1] *= self.settings["contrast"]
-            hls[:, :, 2] *= self.settings["saturation"]
-            hls = np.clip(hls, 0, 255).astype(np.uint8)
-            frame = cv2.cvtColor(hls, cv2.COLOR_HLS2BGR)
-            
-        if self.settings["blur"] > 0:
-            k = self.settings["blur"] * 2 + 1
-            frame = cv2.GaussianBlur(frame, (k, k), 0)
-            
-        if self.settings["pixelate"] > 1:
-            h, w = frame.shape[:2]
-            p = self.settings["pixelate"]
-            small = cv2.resize(frame, (max(1, w//p), max(1, h//p)), interpolation=cv2.INTER_LINEAR)
-            frame = cv2.resize(small, (w, h), interpolation=cv2.INTER_NEAREST)
+        profiler = self.profiler
+        backend = self.backend
+        start = time.perf_counter()
+        self.frame_ctx.start(self.prev_frame)
+        for step in self.get_plan():
+            # Device stages may leave the frame as a UMat for the next one
+            if not step.device:
+                frame = backend.download(frame)
+            self.frame_ctx.bind(None if step.device else frame)
+            profiler.begin(step.name)
+            frame = step.fn(frame, self)
+            profiler.end()
 
-        self.prev_frame = frame.copy()
-        return frame
\ No newline at end of file
+        # The copy doubles as the returned frame, so callers on other threads
+        # never hold buffers that the next frame's stages or capture reuse.
+        self.prev_frame = backend.download(frame).copy()
+        backend.end_frame()
+        if profiler.enabled:
+            profiler.end_frame(time.perf_counter() - start)
+        return self.prev_frame
\ No newline at end of file
@@ -2,6 +2,8 @@ import cv2
 import numpy as np
 import time
 
+from .accumulators import to_uint8
+
 def apply_minimalism(frame, processor):
     processed = frame.copy()
     h, w = frame.shape[:2]
@@ -10,14 +12,17 @@ def apply_minimalism(frame, processor):
     if processor.settings["single_pixel"] > 0:
         avg_color = np.mean(processed, axis=(0, 1))
         processed[:] = avg_color
+        processor.profiler.lap("single_pixel")
         
     # Average Reality
     if processor.settings["average_reality"] > 0:
         if processor.average_reality_buffer is None or processor.average_reality_buffer.shape != frame.shape:
             processor.average_reality_buffer = frame.astype(np.float32)
         else:
-            processor.average_reality_buffer = cv2.addWeighted(processor.average_reality_buffer, 0.99, frame.astype(np.float32), 0.01, 0)
-        processed = processor.average_reality_buffer.astype(np.uint8)
+            cv2.accumulateWeighted(frame, processor.average_reality_buffer, 0.01)
+        processed = processor.average_reality_out = to_uint8(processor.average_reality_buffer,
+                                                             processor.average_reality_out)
+        processor.profiler.lap("average_reality")
         
     # Color Census
     if processor.settings["color_census"] > 0:
@@ -25,27 +30,32 @@ def apply_minimalism(frame, processor):
         unique, counts = np.unique(pixels, axis=0, return_counts=True)
         most_common = unique[np.argmax(counts)]
         processed[:] = most_common
+        processor.profiler.lap("color_census")
         
     # Entropy Maximizer
     if processor.settings["entropy_maximizer"] > 0:
-        noise = np.random.randint(0, 256, (h, w, 3), dtype=np.uint8)
+        noise = processor.noise.uniform((h, w, 3))
         processed = cv2.addWeighted(processed, 0.9, noise, 0.1, 0)
+        processor.profiler.lap("entropy_maximizer")
         
     # Camera Amnesia
     if processor.settings["camera_amnesia"] > 0:
         if time.time() - processor.amnesia_timer > processor.settings["camera_amnesia"]:
             processed[:] = 0
             processor.amnesia_timer = time.time()
+        processor.profiler.lap("camera_amnesia")
             
     # Reality Quantizer
     if processor.settings["reality_quantizer"] > 0:
         small = cv2.resize(processed, (16, 16), interpolation=cv2.INTER_NEAREST)
         processed = cv2.resize(small, (w, h), interpolation=cv2.INTER_NEAREST)
+        processor.profiler.lap("reality_quantizer")
         
     # Noise Wins
     if processor.settings["noise_wins"] > 0:
-        noise = np.random.randint(0, 256, (h, w, 3), dtype=np.uint8)
+        noise = processor.noise.uniform((h, w, 3))
         alpha = min(1.0, (time.time() - processor.session_start_time) / 60.0)
         processed = cv2.addWeighted(processed, 1.0 - alpha, noise, alpha, 0)
+        processor.profiler.lap("noise_wins")
         
     return processed
\ No newline at end of file
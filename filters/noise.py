@@ -0,0 +1,86 @@
+from collections import OrderedDict
+
+import numpy as np
+
+class NoiseService:
+    """Random textures for the noise effects, drawn from a np.random.Generator.
+
+    Full-frame textures are generated a few at a time per shape and
+    distribution, a margin larger than the frame, and each request returns
+    a read-only window into one of them at a random offset. That gives a
+    different-looking field every frame for the price of two random ints.
+    Effects that need genuinely fresh values (sparse bit flips, scanline
+    positions) draw them from rng directly.
+
+    seed() makes the output reproducible: it seeds the generator that
+    fills the pools, and also the legacy np.random state the geometric
+    effects still use. seed_frame(index) then derives the per-frame draws
+    from (seed, index), so a frame renders the same whichever worker
+    processes it.
+    """
+
+    def __init__(self, seed=None, pool_size=4, margin=64, max_pools=8):
+        self.pool_size = pool_size
+        self.margin = margin
+        self.max_pools = max_pools
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        self.base_seed = seed
+        self.rng = np.random.default_rng(seed)
+        self._pool_rng = np.random.default_rng(seed)
+        self.pools = OrderedDict()
+        if seed is not None:
+            np.random.seed(seed)
+
+    def seed_frame(self, index):
+        if self.base_seed is not None:
+            self.rng = np.random.default_rng((self.base_seed, index))
+            np.random.seed((self.base_seed, index))
+
+    def _pool(self, key, shape, make):
+        pool = self.pools.get(key)
+        if pool is None:
+            padded = (shape[0] + self.margin, shape[1] + self.margin) + tuple(shape[2:])
+            pool = []
+            for _ in range(self.pool_size):
+                texture = make(padded)
+                texture.flags.writeable = False
+                pool.append(texture)
+            self.pools[key] = pool
+            if len(self.pools) > self.max_pools:
+                self.pools.popitem(last=False)
+        else:
+            self.pools.move_to_end(key)
+        return pool
+
+    def _window(self, key, shape, make):
+        pool = self._pool(key, tuple(shape), make)
+        texture = pool[self.rng.integers(len(pool))]
+        dy, dx = self.rng.integers(0, self.margin + 1, 2)
+        return texture[dy:dy + shape[0], dx:dx + shape[1]]
+
+    def uniform(self, shape, high=256):
+        """uint8 values in [0, high)."""
+        make = lambda padded: self._pool_rng.integers(0, high, padded, dtype=np.uint8)
+        return self._window(("uniform", shape, high), shape, make)
+
+    def binary(self, shape):
+        """uint8 values that are either 0 or 255."""
+        make = lambda padded: self._pool_rng.integers(0, 2, padded, dtype=np.uint8) * np.uint8(255)
+        return self._window(("binary", shape), shape, make)
+
+    def normal(self, shape, sigma):
+        """Gaussian noise with the given sigma, cast to uint8 like
+        np.random.normal(0, sigma, shape).astype(np.uint8) would be."""
+        # The pool holds N(0, 1) in 1/32 steps as int8, clipped at 4 sigma
+        make = lambda padded: np.clip(np.rint(self._pool_rng.standard_normal(padded, dtype=np.float32) * 32),
+                                      -127, 127).astype(np.int8)
+        unit = self._window(("normal", shape), shape, make)
+        return np.multiply(unit, np.float32(sigma / 32.0)).astype(np.uint8)
+
+    def positions(self, size, probability):
+        """Random flat indices into an array of the given size, each index
+        picked with the given probability (repeats are possible but rare)."""
+        count = self.rng.binomial(size, min(1.0, probability))
+        return self.rng.integers(0, size, count)
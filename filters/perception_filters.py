@@ -2,6 +2,13 @@ import cv2
 import numpy as np
 import time
 
+from .color_lut import ColorChain, IDENTITY
+from .row_shift import band_offsets, shift_rows
+
+# LAB curve inverting the A and B channels
+IMPOSSIBLE_COLORS = 255 - IDENTITY
+IMPOSSIBLE_COLORS[:, 0] = IDENTITY[:, 0]
+
 def apply_perception_weirdness(frame, processor):
     processed = frame.copy()
     h, w = frame.shape[:2]
@@ -9,16 +16,14 @@ def apply_perception_weirdness(frame, processor):
     # Motion Hallucination
     if processor.settings["motion_hallucination"] > 0:
         offset = int(time.time() * 10) % 20
-        for i in range(0, h, 20):
-            processed[i:i+10] = np.roll(processed[i:i+10], offset, axis=1)
-            processed[i+10:i+20] = np.roll(processed[i+10:i+20], -offset, axis=1)
+        shift_rows(processed, band_offsets(h, 10, offset))
+        processor.profiler.lap("motion_hallucination")
             
     # Impossible Colors
     if processor.settings["impossible_colors"] > 0:
-        lab = cv2.cvtColor(processed, cv2.COLOR_BGR2LAB).astype(np.float32)
-        lab[:,:,1] = 255 - lab[:,:,1] # Invert A channel
-        lab[:,:,2] = 255 - lab[:,:,2] # Invert B channel
-        processed = cv2.cvtColor(lab.astype(np.uint8), cv2.COLOR_LAB2BGR)
+        colors = ColorChain(processor.profiler)
+        colors.curve("impossible_colors", IMPOSSIBLE_COLORS, "LAB")
+        processed = colors.apply(processed)
         
     # Edge Overload
     if processor.settings["edge_overload"] > 0:
@@ -26,12 +31,14 @@ def apply_perception_weirdness(frame, processor):
             edges = cv2.Canny(processed, 50, 150)
             edges_3ch = cv2.merge([edges]*3)
             processed = cv2.addWeighted(processed, 0.8, edges_3ch, 0.5, 0)
+        processor.profiler.lap("edge_overload")
             
     # Depth Inversion
     if processor.settings["depth_inversion"] > 0:
         gray = cv2.cvtColor(processed, cv2.COLOR_BGR2GRAY)
         inverted_gray = 255 - gray
         processed = cv2.applyColorMap(inverted_gray, cv2.COLORMAP_JET)
+        processor.profiler.lap("depth_inversion")
         
     # Face Ghosting
     if processor.settings["face_ghosting"] > 0:
@@ -43,26 +50,30 @@ def apply_perception_weirdness(frame, processor):
         mask_3ch = cv2.merge([mask]*3)
         ghost = cv2.GaussianBlur(processed, (25, 25), 0)
         processed = np.where(mask_3ch > 0, cv2.addWeighted(processed, 0.5, ghost, 0.5, 0), processed)
+        processor.profiler.lap("face_ghosting")
         
     # Pareidolia Booster
     if processor.settings["pareidolia_booster"] > 0:
         # Enhance local contrast and sharpen
         kernel = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
         processed = cv2.filter2D(processed, -1, kernel)
+        processor.profiler.lap("pareidolia_booster")
         
     # Visual Tinnitus
     if processor.settings["visual_tinnitus"] > 0:
         gray = cv2.cvtColor(processed, cv2.COLOR_BGR2GRAY)
-        noise = np.random.randint(0, 256, (h, w), dtype=np.uint8)
+        noise = processor.noise.uniform((h, w))
         mask = (gray.astype(np.float32) / 255.0) * (processor.settings["visual_tinnitus"] / 100.0)
         mask_3ch = cv2.merge([mask]*3)
         noise_3ch = cv2.merge([noise]*3)
         processed = (processed * (1 - mask_3ch) + noise_3ch * mask_3ch).astype(np.uint8)
+        processor.profiler.lap("visual_tinnitus")
         
     # Afterimage Trap
     if processor.settings["afterimage_trap"] > 0 and processor.prev_frame is not None:
         if processor.prev_frame.shape == frame.shape:
             inverted_prev = 255 - processor.prev_frame
             processed = cv2.addWeighted(processed, 0.7, inverted_prev, 0.3, 0)
+        processor.profiler.lap("afterimage_trap")
             
     return processed
\ No newline at end of file
@@ -1,6 +1,8 @@
 import cv2
 import numpy as np
 
+from .block_grid import grid_shape, flip_blocks, shift_blocks
+
 def apply_pipeline(frame, processor):
     h, w = frame.shape[:2]
     pipeline = processor.settings["pipeline"]
@@ -35,8 +37,8 @@ def apply_pipeline(frame, processor):
         res[h//2:, w//2:] = cv2.resize(small, (w//2, h//2))
         return res
     elif pipeline == "Time-Shifted Split":
-        if len(processor.time_buffer) > 30:
-            past = processor.time_buffer[-30]
+        if len(processor.history) > 30:
+            past = processor.history.ago(29)
             res = frame.copy()
             res[:, :w//2] = past[:, :w//2]
             return res
@@ -55,13 +57,10 @@ def apply_pipeline(frame, processor):
             res = cv2.addWeighted(res, 0.7, warped, 0.3, 0)
         return res
     elif pipeline == "Checkerboard Mirror":
-        res = frame.copy()
         bs = 64
-        for y in range(0, h, bs):
-            for x in range(0, w, bs):
-                if (x // bs + y // bs) % 2 == 1:
-                    res[y:y+bs, x:x+bs] = cv2.flip(frame[y:y+bs, x:x+bs], 1)
-        return res
+        rows, cols = grid_shape(h, w, bs)
+        odd = (np.arange(rows)[:, None] + np.arange(cols)) % 2 == 1
+        return flip_blocks(frame, bs, odd)
     elif pipeline == "Kaleidoscope 8-way":
         # 8-way symmetry
         p1 = frame[:h//2, :w//2]
@@ -76,19 +75,17 @@ def apply_pipeline(frame, processor):
         res = cv2.addWeighted(res, 0.5, transposed, 0.5, 0)
         return cv2.resize(res, (w, h))
     elif pipeline == "Scanline Interlace":
-        if len(processor.time_buffer) > 10:
-            past = processor.time_buffer[-10]
+        if len(processor.history) > 10:
+            past = processor.history.ago(9)
             res = frame.copy()
             res[::2, :] = past[::2, :]
             return res
     elif pipeline == "Glitch Grid":
-        res = frame.copy()
         bs = 40
-        for y in range(0, h, bs):
-            for x in range(0, w, bs):
-                if np.random.random() < 0.1:
-                    res[y:y+bs, x:x+bs] = np.roll(res[y:y+bs, x:x+bs], np.random.randint(-10, 10), axis=1)
-        return res
+        rows, cols = grid_shape(h, w, bs)
+        shifts = np.random.randint(-10, 10, (rows, cols))
+        shifts[np.random.random((rows, cols)) >= 0.1] = 0
+        return shift_blocks(frame, bs, shifts)
     elif pipeline == "Vertical Slit Scan":
         if processor.slit_scan_buffer is None or processor.slit_scan_buffer.shape != frame.shape:
             processor.slit_scan_buffer = np.zeros_like(frame)
@@ -0,0 +1,71 @@
+import cv2
+import numpy as np
+
+from .block_grid import pixels
+
+# Pixel sorting works line by line: along rows (axis=1) or columns
+# (axis=0). Keys are uint8 so that numpy's stable argsort can use radix
+# sort, and every selected line of the frame is sorted by a single
+# argsort call.
+SORT_KEYS = ("Luminance", "Hue", "Age")
+SORT_AXES = ("Rows", "Columns")
+
+def sort_key(img, name, age=None):
+    """Per-pixel uint8 sort key. "Age" uses the age map when it matches the
+    frame and falls back to luminance otherwise."""
+    if name == "Age" and age is not None and age.shape == img.shape[:2]:
+        return np.clip(age, 0, 255).astype(np.uint8)
+    if name == "Hue":
+        return cv2.cvtColor(img, cv2.COLOR_BGR2HSV_FULL)[:, :, 0]
+    return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+def axis_of(name):
+    return 0 if name == "Columns" else 1
+
+def _lines(img, axis):
+    # Row-major array in which every line to sort is a row
+    return img if axis == 1 else np.ascontiguousarray(img.swapaxes(0, 1))
+
+def _gather(img, axis, sel, order):
+    """Copy of img with line sel[i] reordered by order[i]."""
+    h, w = img.shape[:2]
+    packed = img.ndim == 3 and img.shape[2] == 3 and img.dtype == np.uint8
+    if packed:
+        # BGR pixels move fastest as single uint32 words
+        src = cv2.cvtColor(img, cv2.COLOR_BGR2BGRA).view(np.uint32)[:, :, 0]
+    else:
+        src = pixels(img.copy()).reshape(h, w)
+    lines = _lines(src, axis)
+    n = lines.shape[1]
+    lines[sel] = lines.ravel().take((sel * n)[:, None] + order)
+    src = lines if axis == 1 else np.ascontiguousarray(lines.T)
+    if packed:
+        return cv2.cvtColor(src.view(np.uint8).reshape(h, w, 4), cv2.COLOR_BGRA2BGR)
+    return src.view(img.dtype).reshape(img.shape)
+
+def sort_lines(img, key, lines, axis=1):
+    """Sort every line flagged in the bool vector lines by key."""
+    sel = np.flatnonzero(lines)
+    if len(sel) == 0:
+        return img
+    order = np.argsort(_lines(key, axis)[sel], axis=1, kind="stable")
+    return _gather(img, axis, sel, order)
+
+def sort_intervals(img, key, mask, axis=1):
+    """Sort each run of consecutive masked pixels along a line by key; the
+    pixels outside the mask stay where they are."""
+    key, mask = _lines(key, axis), _lines(mask, axis)
+    sel = np.flatnonzero(mask.any(axis=1))
+    if len(sel) == 0:
+        return img
+    key, mask = key[sel], mask[sel]
+    # Number the runs along each line. Unmasked pixels each get a run of
+    # their own, so sorting by run first keeps them in place.
+    starts = ~mask
+    starts[:, 1:] |= mask[:, 1:] & ~mask[:, :-1]
+    runs = np.cumsum(starts, axis=1, dtype=np.uint16)
+    # Two stable passes, key then run, give the order within every run
+    order = np.argsort(key, axis=1, kind="stable")
+    order = np.take_along_axis(order, np.argsort(np.take_along_axis(runs, order, axis=1),
+                                                 axis=1, kind="stable"), axis=1)
+    return _gather(img, axis, sel, order)
@@ -0,0 +1,88 @@
+import time
+import numpy as np
+
+class StageProfiler:
+    """Rolling wall-clock timings for stage families and the effects inside them.
+
+    Each name keeps its last `window` samples in a fixed numpy ring, so
+    recording is a couple of stores per call. The processor brackets every
+    stage with begin()/end(); stages call lap(effect) at the end of each
+    effect block, which records the time since the previous lap as
+    "stage.effect". After expire(), the names that the next frame does not
+    record are dropped, so switched-off effects leave the table.
+    """
+
+    def __init__(self, window=120):
+        self.window = window
+        self.enabled = True
+        self.rings = {}
+        self._stage = None
+        self._stage_start = 0.0
+        self._mark = 0.0
+        self._seen = None
+
+    def record(self, name, seconds):
+        if self._seen is not None:
+            self._seen.add(name)
+        ring = self.rings.get(name)
+        if ring is None:
+            ring = self.rings[name] = [np.zeros(self.window), 0, 0]
+        samples, index, count = ring
+        samples[index] = seconds
+        ring[1] = (index + 1) % self.window
+        ring[2] = min(count + 1, self.window)
+
+    def begin(self, stage):
+        if self.enabled:
+            self._stage = stage
+            self._stage_start = self._mark = time.perf_counter()
+
+    def lap(self, effect):
+        if self.enabled and self._stage is not None:
+            now = time.perf_counter()
+            self.record(f"{self._stage}.{effect}", now - self._mark)
+            self._mark = now
+
+    def end(self):
+        if self.enabled and self._stage is not None:
+            self.record(self._stage, time.perf_counter() - self._stage_start)
+            self._stage = None
+
+    def expire(self):
+        """Forget every name that the next frame does not record."""
+        self._seen = set()
+
+    def end_frame(self, seconds):
+        self.record("total", seconds)
+        if self._seen is not None:
+            for name in set(self.rings) - self._seen:
+                del self.rings[name]
+            self._seen = None
+
+    def reset(self):
+        self.rings.clear()
+
+    def stats(self):
+        """Per-name dict of mean, p95, max and last time in milliseconds."""
+        result = {}
+        for name, (samples, index, count) in list(self.rings.items()):
+            if count == 0:
+                continue
+            values = samples[:count] * 1000.0
+            result[name] = {
+                "mean": float(values.mean()),
+                "p95": float(np.percentile(values, 95)),
+                "max": float(values.max()),
+                "last": float(samples[(index - 1) % self.window] * 1000.0),
+                "count": count,
+            }
+        return result
+
+    def format_table(self, limit=15):
+        stats = self.stats()
+        names = sorted(stats, key=lambda n: stats[n]["mean"], reverse=True)[:limit]
+        lines = [f"{'stage':<32}{'mean':>8}{'p95':>8}{'max':>8}"]
+        for name in names:
+            s = stats[name]
+            lines.append(f"{name:<32}{s['mean']:8.2f}{s['p95']:8.2f}{s['max']:8.2f}")
+        return "\n".join(lines)
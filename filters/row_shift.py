@@ -0,0 +1,34 @@
+import numpy as np
+
+# Row displacement for the tearing effects: every row of the frame rolls
+# sideways by its own offset, wrapping around like np.roll on that row
+# alone, in one gather instead of one roll per row.
+
+def shift_rows(img, offsets):
+    """Roll row y of img right by offsets[y] pixels (negative rolls left),
+    in place. Only the rows that move are touched."""
+    offsets = np.asarray(offsets)
+    rows = np.flatnonzero(offsets)
+    if len(rows) == 0:
+        return
+    h, w = img.shape[:2]
+    moving = img if len(rows) == h else img[rows]
+    # With every row laid twice side by side, a rolled row is just a
+    # w-pixel window starting (-offset) % w pixels in. Viewing each such
+    # window as a single element turns all the rows into one take().
+    doubled = np.concatenate((moving, moving), axis=1)
+    px = img[0, 0].nbytes
+    windows = np.ndarray((2 * len(rows) * w - w + 1,), dtype=np.dtype((np.void, w * px)),
+                         buffer=doubled, strides=(px,))
+    start = np.arange(len(rows)) * (2 * w) + (-offsets[rows]) % w
+    img[rows] = windows[start].view(img.dtype).reshape(moving.shape)
+
+def random_offsets(h, probability, low, high):
+    """Per-row offsets in [low, high) for a random share of rows, zero elsewhere."""
+    offsets = np.random.randint(low, high, h)
+    offsets[np.random.random(h) >= probability] = 0
+    return offsets
+
+def band_offsets(h, band, offset):
+    """Alternating bands of rows rolled by +offset and -offset."""
+    return np.where((np.arange(h) // band) % 2 == 0, offset, -offset)
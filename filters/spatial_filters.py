@@ -1,6 +1,37 @@
 import cv2
 import numpy as np
 
+from .row_shift import shift_rows
+from .warp_maps import warp
+
+# Voronoi labels are computed at 1/VORONOI_SCALE resolution and upscaled
+VORONOI_SCALE = 4
+
+# Chance out of 256 that a bright pixel sheds a grain of sand each frame
+GRAVITY_SPAWN = 6
+
+def _sand_step(sand, colors, side):
+    """Advance the falling-sand grid one step in place. Every grain with a
+    free cell below falls, blocked grains slide diagonally towards side,
+    and grains on the bottom row fall out of the frame. The colour copies
+    overlap in memory but never read a cell that the same step writes."""
+    sand[-1] = False
+    blocked = sand[:-1] & sand[1:]
+    fall = sand[:-1] & ~sand[1:]
+    cv2.copyTo(colors[:-1], fall.view(np.uint8), colors[1:])
+    sand[:-1] &= ~fall
+    sand[1:] |= fall
+    
+    # A grain only ever slides one way per step, so no two claim the same cell
+    if side > 0:
+        src, dst = (slice(None, -1), slice(None, -1)), (slice(1, None), slice(1, None))
+    else:
+        src, dst = (slice(None, -1), slice(1, None)), (slice(1, None), slice(None, -1))
+    slide = blocked[:, src[1]] & ~sand[dst]
+    cv2.copyTo(colors[src], slide.view(np.uint8), colors[dst])
+    sand[src] &= ~slide
+    sand[dst] |= slide
+
 def apply_spatial_chaos(frame, processor):
     processed = frame.copy()
     h, w = frame.shape[:2]
@@ -8,24 +39,33 @@ def apply_spatial_chaos(frame, processor):
     # Pixel Gravity
     if processor.settings["pixel_gravity"] > 0:
         if processor.gravity_buffer is None or processor.gravity_buffer.shape != frame.shape:
-            processor.gravity_buffer = frame.copy()
+            processor.gravity_buffer = np.zeros_like(frame)
+            processor.gravity_mask = np.zeros((h, w), dtype=bool)
+        sand, colors = processor.gravity_mask, processor.gravity_buffer
+        
+        # New grains come loose from the bright parts of the frame
+        # First block of the stage, so processed is still the input
+        gray = processor.frame_ctx.gray()
+        spawn = (gray > 128) & (np.random.randint(0, 256, (h, w), dtype=np.uint8) < GRAVITY_SPAWN) & ~sand
+        cv2.copyTo(processed, spawn.view(np.uint8), colors)
+        sand |= spawn
         
-        gray = cv2.cvtColor(processed, cv2.COLOR_BGR2GRAY)
-        for _ in range(processor.settings["pixel_gravity"]):
-            y_indices, x_indices = np.where(gray > 128)
-            if len(y_indices) > 0:
-                for i in range(min(len(y_indices), 1000)):
-                    idx = np.random.randint(0, len(y_indices))
-                    y, x = y_indices[idx], x_indices[idx]
-                    if y < h - 1:
-                        processed[y+1, x] = processed[y, x]
+        side = np.random.choice((-1, 1))
+        for _ in range(1 + processor.settings["pixel_gravity"] // 10):
+            _sand_step(sand, colors, side)
+            side = -side
+        cv2.copyTo(colors, sand.view(np.uint8), processed)
+        processor.profiler.lap("pixel_gravity")
         
     # Reality Tear
     if processor.settings["reality_tear"] > 0:
-        for _ in range(processor.settings["reality_tear"]):
-            y = np.random.randint(0, h)
-            shift = np.random.randint(-50, 50)
-            processed[y:] = np.roll(processed[y:], shift, axis=1)
+        # Each tear rolls everything below it, so the offsets add up down the frame
+        tears = processor.settings["reality_tear"]
+        starts = np.random.randint(0, h, tears)
+        shifts = np.random.randint(-50, 50, tears)
+        offsets = np.cumsum(np.bincount(starts, weights=shifts, minlength=h)).astype(np.intp)
+        shift_rows(processed, offsets)
+        processor.profiler.lap("reality_tear")
             
     # Recursive Zoom Hole
     if processor.settings["recursive_zoom"] > 0:
@@ -34,33 +74,61 @@ def apply_spatial_chaos(frame, processor):
         M = cv2.getRotationMatrix2D(center, 0, scale)
         zoomed = cv2.warpAffine(processed, M, (w, h))
         processed = cv2.addWeighted(processed, 0.5, zoomed, 0.5, 0)
+        processor.profiler.lap("recursive_zoom")
         
     # Voronoi Destruction
     if processor.settings["voronoi_dest"] > 0:
         num_points = processor.settings["voronoi_dest"]
-        points = np.column_stack((np.random.randint(0, w, num_points), np.random.randint(0, h, num_points)))
-        res = np.zeros_like(processed)
-        for y in range(0, h, 10):
-            for x in range(0, w, 10):
-                dists = np.sum((points - [x, y])**2, axis=1)
-                closest = points[np.argmin(dists)]
-                res[y:y+10, x:x+10] = processed[closest[1], closest[0]]
-        processed = res
+        points = processor.voronoi_points
+        if points is None or processor.voronoi_size != (h, w):
+            points = np.empty((0, 2), dtype=np.float32)
+            processor.voronoi_velocity = np.empty((0, 2), dtype=np.float32)
+            processor.voronoi_size = (h, w)
+        # Keep the seeds across frames, only adding or dropping the difference
+        if len(points) < num_points:
+            extra = num_points - len(points)
+            points = np.vstack((points, np.random.random((extra, 2)).astype(np.float32) * [w, h]))
+            processor.voronoi_velocity = np.vstack((processor.voronoi_velocity,
+                                                    np.random.uniform(-2, 2, (extra, 2)).astype(np.float32)))
+        points = points[:num_points]
+        velocity = processor.voronoi_velocity[:num_points]
+        
+        # Drift the seeds, bouncing off the frame edges
+        points += velocity
+        limit = np.array([w - 1, h - 1], dtype=np.float32)
+        bounced = (points < 0) | (points > limit)
+        velocity[bounced] *= -1
+        np.clip(points, 0, limit, out=points)
+        processor.voronoi_points = points
+        processor.voronoi_velocity = velocity
+        
+        # Nearest-seed labels from a distance transform at reduced resolution
+        scale = VORONOI_SCALE
+        sh, sw = -(-h // scale), -(-w // scale)
+        seeds = (points / scale).astype(np.intp)
+        mask = np.full((sh, sw), 255, dtype=np.uint8)
+        mask[seeds[:, 1], seeds[:, 0]] = 0
+        labels = cv2.distanceTransformWithLabels(mask, cv2.DIST_L2, 5, labelType=cv2.DIST_LABEL_PIXEL)[1]
+        # Labels number the seed pixels in row-major order
+        seed_at = np.zeros((sh, sw), dtype=np.intp)
+        seed_at[seeds[:, 1], seeds[:, 0]] = np.arange(num_points)
+        order = seed_at.ravel()[np.flatnonzero(mask == 0)]
+        full = points.astype(np.intp)
+        colors = processed[full[order, 1], full[order, 0]]
+        cells = colors[labels - 1]
+        processed = cv2.resize(cells, (sw * scale, sh * scale), interpolation=cv2.INTER_NEAREST)[:h, :w]
+        processor.profiler.lap("voronoi_dest")
         
     # Non-Euclidean Mirror
     if processor.settings["non_euclidean"] > 0:
-        flex_x = np.zeros((h, w), np.float32)
-        flex_y = np.zeros((h, w), np.float32)
-        for y in range(h):
-            for x in range(w):
-                flex_x[y, x] = x + np.sin(y / 10.0) * processor.settings["non_euclidean"]
-                flex_y[y, x] = y + np.cos(x / 10.0) * processor.settings["non_euclidean"]
-        processed = cv2.remap(processed, flex_x, flex_y, cv2.INTER_LINEAR)
+        processed = warp(processed, "sine_wave", processor.settings["non_euclidean"])
+        processor.profiler.lap("non_euclidean")
         
     # Pixel Erosion
     if processor.settings["pixel_erosion"] > 0:
         kernel = np.ones((3, 3), np.uint8)
         processed = cv2.erode(processed, kernel, iterations=processor.settings["pixel_erosion"])
+        processor.profiler.lap("pixel_erosion")
         
     # Fracture Glass
     if processor.settings["fracture_glass"] > 0:
@@ -72,6 +140,7 @@ def apply_spatial_chaos(frame, processor):
             dy = np.random.randint(-10, 10)
             shard = processed[y:y+100, x:x+100].copy()
             processed[np.clip(y+dy, 0, h-100):np.clip(y+dy+100, 0, h), np.clip(x+dx, 0, w-100):np.clip(x+dx+100, 0, w)] = shard
+        processor.profiler.lap("fracture_glass")
         
     # Spatial Feedback
     if processor.settings["spatial_feedback"] > 0:
@@ -82,10 +151,12 @@ def apply_spatial_chaos(frame, processor):
         y2, x2 = np.random.randint(0, h-roi_size), np.random.randint(0, w-roi_size)
         processor.spatial_feedback_buffer[y1:y1+roi_size, x1:x1+roi_size] = processed[y2:y2+roi_size, x2:x2+roi_size]
         processed = cv2.addWeighted(processed, 0.7, processor.spatial_feedback_buffer, 0.3, 0)
+        processor.profiler.lap("spatial_feedback")
         
     # Folding Space
     if processor.settings["folding_space"] > 0:
         for _ in range(processor.settings["folding_space"]):
             processed = cv2.addWeighted(processed, 0.5, cv2.flip(processed, 1), 0.5, 0)
+        processor.profiler.lap("folding_space")
             
     return processed
\ No newline at end of file
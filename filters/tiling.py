@@ -0,0 +1,70 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+class TileScheduler:
+    """Runs a spatially local filter on overlapping tiles in parallel.
+
+    The frame is cut into a grid of about `workers` tiles; each one is
+    processed with `halo` extra pixels of context on every side (clipped at
+    the frame border) and only its centre is written back, so the seams
+    match a single full-frame call as long as the filter's reach is within
+    the halo. Filters whose reach is unbounded, like the recursive filter
+    behind cv2.stylization, must not be tiled. The OpenCV calls release the
+    GIL, so the default thread pool scales; kind="process" uses a spawned
+    process pool instead, which needs a picklable module-level fn.
+    """
+
+    KINDS = ("thread", "process")
+
+    def __init__(self, workers=None, kind="thread", min_pixels=640 * 360):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown tile executor: {kind}")
+        self.workers = workers or os.cpu_count() or 1
+        self.kind = kind
+        self.min_pixels = min_pixels
+        self._executor = None
+
+    def executor(self):
+        if self._executor is None:
+            if self.kind == "process":
+                context = multiprocessing.get_context("spawn")
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=context)
+            else:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="tile")
+        return self._executor
+
+    def grid(self, h, w):
+        # Near-square tiles keep the halo overhead down
+        rows = max(1, int(round(np.sqrt(self.workers * h / w))))
+        cols = max(1, -(-self.workers // rows))
+        ys = np.linspace(0, h, rows + 1).astype(int)
+        xs = np.linspace(0, w, cols + 1).astype(int)
+        return [(ys[r], ys[r + 1], xs[c], xs[c + 1]) for r in range(rows) for c in range(cols)]
+
+    def run(self, fn, frame, halo):
+        h, w = frame.shape[:2]
+        if self.workers <= 1 or h * w < self.min_pixels:
+            return fn(frame)
+
+        tiles = self.grid(h, w)
+        jobs = []
+        for y0, y1, x0, x1 in tiles:
+            top, left = max(0, y0 - halo), max(0, x0 - halo)
+            src = frame[top:min(h, y1 + halo), left:min(w, x1 + halo)]
+            jobs.append((self.executor().submit(fn, src), y0 - top, x0 - left))
+
+        out = None
+        for (y0, y1, x0, x1), (job, dy, dx) in zip(tiles, jobs):
+            result = job.result()
+            if out is None:
+                out = np.empty((h, w) + result.shape[2:], dtype=result.dtype)
+            out[y0:y1, x0:x1] = result[dy:dy + y1 - y0, dx:dx + x1 - x0]
+        return out
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,130 @@
+import cv2
+import numpy as np
+from collections import OrderedDict
+
+# Remap grids are expensive to build but only depend on the frame size and a
+# slider value, so they are built once with vectorized math and kept in an
+# LRU cache keyed by (height, width, effect, quantized parameter, format).
+MAX_CACHED_MAPS = 32
+PARAM_DECIMALS = 2
+
+_cache = OrderedDict()
+
+def _grid(h, w):
+    return np.meshgrid(np.arange(w, dtype=np.float64), np.arange(h, dtype=np.float64))
+
+def _swirl_maps(h, w, strength):
+    x, y = _grid(h, w)
+    center_x, center_y = w // 2, h // 2
+    radius = min(w, h) // 2
+    dx, dy = x - center_x, y - center_y
+    distance = np.sqrt(dx**2 + dy**2)
+    angle = np.arctan2(dy, dx) + strength * (radius - distance) / radius
+    inside = distance < radius
+    flex_x = np.where(inside, center_x + distance * np.cos(angle), x)
+    flex_y = np.where(inside, center_y + distance * np.sin(angle), y)
+    return flex_x, flex_y
+
+def _sine_wave_maps(h, w, strength):
+    x, y = _grid(h, w)
+    flex_x = x + np.sin(y / 10.0) * strength
+    flex_y = y + np.cos(x / 10.0) * strength
+    return flex_x, flex_y
+
+def _vortex_maps(h, w, strength):
+    x, y = _grid(h, w)
+    center_x, center_y = w // 2, h // 2
+    dx, dy = x - center_x, y - center_y
+    dist = np.sqrt(dx**2 + dy**2)
+    angle = np.arctan2(dy, dx) + dist / 100.0 * strength
+    return center_x + dist * np.cos(angle), center_y + dist * np.sin(angle)
+
+BUILDERS = {
+    "swirl": _swirl_maps,
+    "sine_wave": _sine_wave_maps,
+    "vortex": _vortex_maps,
+}
+
+def _vortex_history_lookup(h, w, strength):
+    # Frame age per pixel (one frame per 10px from the centre) and the flat
+    # index of the source pixel in the vortex grid, wrapped at the borders
+    x, y = _grid(h, w)
+    ages = (np.sqrt((x - w // 2)**2 + (y - h // 2)**2) / 10).astype(np.intp)
+    flex_x, flex_y = get_maps("vortex", h, w, strength)
+    pixels = (flex_y.astype(np.intp) % h) * w + flex_x.astype(np.intp) % w
+    return ages, pixels, int(ages.max())
+
+def _slit_scan_lookup(h, w, angle):
+    # Position of each pixel along the scan direction, 0 at the oldest edge
+    # and approaching 1 at the newest. 0 degrees scans across columns like
+    # the Vertical Slit Scan pipeline, 90 degrees across rows.
+    x, y = _grid(h, w)
+    theta = np.deg2rad(angle)
+    # Snapped so the axis-aligned scans come out exact
+    c, s = round(float(np.cos(theta)), 9), round(float(np.sin(theta)), 9)
+    start = min(0.0, w * c) + min(0.0, h * s)
+    extent = abs(w * c) + abs(h * s)
+    positions = (x * c + y * s - start) / extent
+    # Axis the scan runs along when it is axis-aligned: 1 for columns, 0 for rows
+    axis = 1 if s == 0 else 0 if c == 0 else None
+    return positions, np.arange(h * w, dtype=np.intp).reshape(h, w), axis
+
+LOOKUP_BUILDERS = {
+    "vortex_history": _vortex_history_lookup,
+    "slit_scan": _slit_scan_lookup,
+}
+
+def quantize(param):
+    return round(float(param), PARAM_DECIMALS)
+
+def get_maps(effect, h, w, param, fixed_point=False, umat=False):
+    """Return cached (map1, map2) for cv2.remap.
+
+    Float maps are (flex_x, flex_y) as float32. With fixed_point the pair
+    comes from cv2.convertMaps (CV_16SC2 + CV_16UC1), which remaps faster.
+    With umat the maps are uploaded once and returned as cv2.UMat.
+    """
+    param = quantize(param)
+    key = (h, w, effect, param, fixed_point, umat)
+    maps = _cache.get(key)
+    if maps is not None:
+        _cache.move_to_end(key)
+        return maps
+
+    if umat:
+        maps = tuple(cv2.UMat(m) for m in get_maps(effect, h, w, param, fixed_point))
+    elif fixed_point:
+        flex_x, flex_y = get_maps(effect, h, w, param)
+        maps = cv2.convertMaps(flex_x, flex_y, cv2.CV_16SC2)
+    else:
+        flex_x, flex_y = BUILDERS[effect](h, w, param)
+        maps = (flex_x.astype(np.float32), flex_y.astype(np.float32))
+
+    _cache[key] = maps
+    while len(_cache) > MAX_CACHED_MAPS:
+        _cache.popitem(last=False)
+    return maps
+
+def get_lookup(effect, h, w, param):
+    """Return a cached index table from LOOKUP_BUILDERS, same LRU as the maps."""
+    param = quantize(param)
+    key = (h, w, effect, param)
+    lookup = _cache.get(key)
+    if lookup is not None:
+        _cache.move_to_end(key)
+        return lookup
+    lookup = LOOKUP_BUILDERS[effect](h, w, param)
+    _cache[key] = lookup
+    while len(_cache) > MAX_CACHED_MAPS:
+        _cache.popitem(last=False)
+    return lookup
+
+def warp(frame, effect, param, shape=None, interpolation=cv2.INTER_LINEAR):
+    """Remap a frame (ndarray or UMat) through a cached warp grid."""
+    is_umat = isinstance(frame, cv2.UMat)
+    h, w = shape if shape is not None else frame.shape[:2]
+    map1, map2 = get_maps(effect, h, w, param, fixed_point=True, umat=is_umat)
+    return cv2.remap(frame, map1, map2, interpolation)
+
+def clear_cache():
+    _cache.clear()
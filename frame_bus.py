@@ -0,0 +1,184 @@
+import os
+import struct
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+# Shared-memory layout, all little-endian:
+#   bus header (64 bytes):   magic, version, slot count, slot size, latest seq,
+#                            writer pid
+#   slot headers (64 each):  seq, timestamp, height, width, channels, pixel format
+#   slot data (slot size each, 64-byte aligned)
+# A slot's seq is zeroed while the writer fills it and set to the frame's
+# sequence number afterwards. Readers check it before and after using the
+# pixels, so a slot overwritten mid-read is detected instead of returned.
+MAGIC = b"ACFB"
+VERSION = 1
+HEADER = struct.Struct("<4sIIQQ")
+SLOT_HEADER = struct.Struct("<QdIII8s")
+HEADER_SIZE = 64
+SLOT_HEADER_SIZE = 64
+LATEST_SEQ_OFFSET = 20
+WRITER_PID_OFFSET = 28
+PIXEL_FORMAT = b"BGR24"
+DEFAULT_NAME = "artcam_frames"
+DEFAULT_MAX_SHAPE = (2160, 3840, 3)
+
+def _align(n, to=64):
+    return (n + to - 1) // to * to
+
+def _attach(name):
+    # Readers must not unlink the segment when they exit; the writer owns it
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+def _is_stale(shm):
+    """Whether a segment left under the bus name can be replaced: it is not
+    a frame bus, or the process that wrote it is gone."""
+    if shm.size < HEADER_SIZE:
+        return True
+    magic, version = HEADER.unpack_from(shm.buf, 0)[:2]
+    if magic != MAGIC or version != VERSION:
+        return True
+    if os.name == "nt":
+        # Windows frees a segment with its last handle, so it is in use
+        return False
+    pid = struct.unpack_from("<Q", shm.buf, WRITER_PID_OFFSET)[0]
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass
+    return False
+
+class FrameBusWriter:
+    """Publishes frames into a ring of shared-memory slots.
+
+    Frames larger than max_shape are skipped with a warning. Slots are
+    reused round-robin, so a reader holding a zero-copy view has slots - 1
+    frames of time before its slot is overwritten.
+
+    A segment already under the name is replaced only if it is stale (see
+    _is_stale); a live bus raises FileExistsError.
+    """
+
+    def __init__(self, name=DEFAULT_NAME, slots=4, max_shape=DEFAULT_MAX_SHAPE):
+        self.name = name
+        self.slots = slots
+        self.slot_bytes = _align(int(np.prod(max_shape)))
+        self.data_offset = _align(HEADER_SIZE + slots * SLOT_HEADER_SIZE)
+        self.seq = 0
+        self.frames_skipped = 0
+        self.lock = threading.Lock()
+        size = self.data_offset + slots * self.slot_bytes
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            existing = _attach(name)
+            stale = _is_stale(existing)
+            existing.close()
+            if not stale:
+                raise FileExistsError(f"Frame bus {name} is in use by another writer") from None
+            # Left behind by a writer that did not close, e.g. after a crash
+            print(f"Frame bus: replacing stale shared memory segment {name}")
+            existing.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        HEADER.pack_into(self.shm.buf, 0, MAGIC, VERSION, slots, self.slot_bytes, 0)
+        struct.pack_into("<Q", self.shm.buf, WRITER_PID_OFFSET, os.getpid())
+
+    def publish(self, frame, timestamp=None):
+        """Copy a BGR uint8 frame into the next slot; returns its seq or None."""
+        if frame.nbytes > self.slot_bytes or frame.dtype != np.uint8 or frame.ndim != 3:
+            if self.frames_skipped == 0:
+                print(f"Frame bus: skipping {frame.shape} {frame.dtype} frames (slot size {self.slot_bytes} bytes)")
+            self.frames_skipped += 1
+            return None
+        with self.lock:
+            if self.shm is None:
+                return None
+            self.seq += 1
+            slot = self.seq % self.slots
+            header_offset = HEADER_SIZE + slot * SLOT_HEADER_SIZE
+            buf = self.shm.buf
+            struct.pack_into("<Q", buf, header_offset, 0)
+            offset = self.data_offset + slot * self.slot_bytes
+            dst = np.ndarray(frame.shape, dtype=np.uint8, buffer=buf, offset=offset)
+            np.copyto(dst, frame)
+            h, w, c = frame.shape
+            SLOT_HEADER.pack_into(buf, header_offset, self.seq,
+                                  time.time() if timestamp is None else timestamp, h, w, c, PIXEL_FORMAT)
+            struct.pack_into("<Q", buf, LATEST_SEQ_OFFSET, self.seq)
+            return self.seq
+
+    def close(self):
+        with self.lock:
+            if self.shm is not None:
+                self.shm.close()
+                self.shm.unlink()
+                self.shm = None
+
+class FrameBusReader:
+    """Client for a FrameBusWriter running in another process.
+
+    read() returns (frame, seq, timestamp) for the newest frame not seen
+    yet, or (None, None, None). With copy=False the frame is a view into
+    shared memory: no copy at all, but it is only guaranteed intact until
+    the writer comes back round to its slot, so check still_valid(seq)
+    after using it.
+    """
+
+    def __init__(self, name=DEFAULT_NAME):
+        self.shm = _attach(name)
+        magic, version, self.slots, self.slot_bytes, _ = HEADER.unpack_from(self.shm.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            self.shm.close()
+            raise ValueError(f"{name} is not an ArtCam frame bus")
+        self.data_offset = _align(HEADER_SIZE + self.slots * SLOT_HEADER_SIZE)
+        self.last_seq = 0
+        self.frames_missed = 0
+
+    def latest_seq(self):
+        return struct.unpack_from("<Q", self.shm.buf, LATEST_SEQ_OFFSET)[0]
+
+    def _slot_header(self, seq):
+        return SLOT_HEADER.unpack_from(self.shm.buf, HEADER_SIZE + (seq % self.slots) * SLOT_HEADER_SIZE)
+
+    def still_valid(self, seq):
+        return self._slot_header(seq)[0] == seq
+
+    def read(self, timeout=0.0, copy=True):
+        deadline = time.monotonic() + timeout
+        while True:
+            seq = self.latest_seq()
+            if seq != self.last_seq:
+                frame, timestamp = self._read_slot(seq, copy)
+                if frame is not None:
+                    if self.last_seq and seq > self.last_seq + 1:
+                        self.frames_missed += seq - self.last_seq - 1
+                    self.last_seq = seq
+                    return frame, seq, timestamp
+            if time.monotonic() >= deadline:
+                return None, None, None
+            time.sleep(0.001)
+
+    def _read_slot(self, seq, copy):
+        slot_seq, timestamp, h, w, c, pixel_format = self._slot_header(seq)
+        if slot_seq != seq or pixel_format.rstrip(b"\0") != PIXEL_FORMAT:
+            return None, None
+        offset = self.data_offset + (seq % self.slots) * self.slot_bytes
+        frame = np.ndarray((h, w, c), dtype=np.uint8, buffer=self.shm.buf, offset=offset)
+        if copy:
+            frame = frame.copy()
+            if not self.still_valid(seq):
+                return None, None
+        return frame, timestamp
+
+    def close(self):
+        self.shm.close()
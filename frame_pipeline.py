@@ -0,0 +1,123 @@
+import queue
+import threading
+import time
+
+def put_latest(q, item):
+    """Queue an item without blocking, discarding the oldest entries if full.
+
+    Returns the number of discarded items.
+    """
+    dropped = 0
+    while True:
+        try:
+            q.put_nowait(item)
+            return dropped
+        except queue.Full:
+            try:
+                q.get_nowait()
+                dropped += 1
+            except queue.Empty:
+                pass
+
+class FramePipeline:
+    """Capture -> process -> display/output, each on its own thread.
+
+    source(timeout) returns the next frame or None; it is expected to be
+    backed by its own capture thread (see CameraManager(threaded=True)).
+    process(frame) runs on the processing worker. display(frame) is called
+    from the worker with at most one frame in flight: the receiver calls
+    display_done() once it has shown it, and frames arriving meanwhile are
+    dropped. Every callable in outputs runs on the output thread, fed by a
+    bounded queue that drops the oldest frame when the outputs fall behind.
+    """
+
+    def __init__(self, source, process, display=None, outputs=(), queue_size=2, max_fps=None):
+        self.source = source
+        self.process = process
+        self.display = display
+        self.outputs = list(outputs)
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.output_queue = queue.Queue(maxsize=queue_size)
+        self.frames_processed = 0
+        self.display_dropped = 0
+        self.output_dropped = 0
+        self.process_errors = 0
+        self.last_error = None
+        self.process_time = 0.0
+        self._display_busy = threading.Event()
+        self._running = False
+        self._threads = []
+
+    def start(self):
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._process_loop, name="process", daemon=True),
+            threading.Thread(target=self._output_loop, name="output", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._running = False
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def display_done(self):
+        self._display_busy.clear()
+
+    def _process_loop(self):
+        last = 0.0
+        while self._running:
+            frame = self.source(0.1)
+            if frame is None:
+                continue
+
+            start = time.perf_counter()
+            try:
+                processed = self.process(frame)
+            except Exception as e:
+                # One bad frame must not stop the worker; a setting that
+                # fails every frame is reported once per distinct error
+                self.process_errors += 1
+                message = f"{type(e).__name__}: {e}"
+                if message != self.last_error:
+                    self.last_error = message
+                    print(f"Frame processing failed: {message}")
+                processed = None
+            else:
+                self.process_time = time.perf_counter() - start
+                self.frames_processed += 1
+
+            if processed is not None and self.display is not None:
+                if self._display_busy.is_set():
+                    self.display_dropped += 1
+                else:
+                    self._display_busy.set()
+                    self.display(processed)
+            if processed is not None and self.outputs:
+                self.output_dropped += put_latest(self.output_queue, processed)
+
+            if self.min_interval:
+                wait = self.min_interval - (time.perf_counter() - last)
+                if wait > 0:
+                    time.sleep(wait)
+                last = time.perf_counter()
+
+    def _output_loop(self):
+        while self._running:
+            try:
+                frame = self.output_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            for output in self.outputs:
+                output(frame)
+
+    def stats(self):
+        return {
+            "processed": self.frames_processed,
+            "display_dropped": self.display_dropped,
+            "output_dropped": self.output_dropped,
+            "process_errors": self.process_errors,
+            "process_ms": self.process_time * 1000.0,
+        }
@@ -4,11 +4,13 @@ import numpy as np
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                             QHBoxLayout, QLabel, QComboBox, QCheckBox, 
                             QSlider, QGroupBox, QFormLayout,
-                            QTabWidget, QScrollArea)
-from PyQt6.QtCore import QTimer, Qt
+                            QTabWidget, QScrollArea, QPushButton, QFileDialog)
+from PyQt6.QtCore import QObject, Qt, QTimer, pyqtSignal
 from PyQt6.QtGui import QImage, QPixmap
 
 from camera_manager import CameraManager, VirtualCameraManager
+from frame_pipeline import FramePipeline
+from frame_bus import FrameBusWriter
 from filters import ImageProcessor
 
 from .tabs.basic_tab import create_basic_tab
@@ -26,19 +28,37 @@ from .tabs.minimalism_tab import create_minimalism_tab
 from .tabs.performance_tab import create_performance_tab
 from .tabs.gpu_tab import create_gpu_tab
 
+class FrameBridge(QObject):
+    # Carries processed frames from the processing worker to the GUI thread
+    frame_ready = pyqtSignal(object)
+
 class ArtCamWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("ArtCam Pro")
-        self.camera_manager = CameraManager()
+        self.camera_manager = CameraManager(threaded=True)
         self.virtual_cam = VirtualCameraManager()
         self.processor = ImageProcessor()
+        self.vcam_enabled = False
+        self.frame_bus = None
+        self.frame_size = (640, 480)
         
         self.init_ui()
         
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_frame)
-        self.timer.start(30)
+        self.bridge = FrameBridge()
+        self.bridge.frame_ready.connect(self.update_frame)
+        self.pipeline = FramePipeline(
+            source=lambda timeout: self.camera_manager.get_frame(timeout, new_only=True),
+            process=self.processor.process,
+            display=self.bridge.frame_ready.emit,
+            outputs=[self.send_outputs],
+            max_fps=60)
+        self.pipeline.start()
+        
+        # Refresh the profiler panel a few times per second, not per frame
+        self.profiler_timer = QTimer()
+        self.profiler_timer.timeout.connect(self.update_profiler)
+        self.profiler_timer.start(500)
 
     def init_ui(self):
         central_widget = QWidget()
@@ -78,6 +98,18 @@ class ArtCamWindow(QMainWindow):
         self.check_vcam.stateChanged.connect(self.toggle_vcam)
         cam_layout.addRow(self.check_vcam)
         
+        self.check_frame_bus = QCheckBox("Publish to Frame Bus")
+        self.check_frame_bus.stateChanged.connect(self.toggle_frame_bus)
+        cam_layout.addRow(self.check_frame_bus)
+        
+        self.check_profiler = QCheckBox("Show Profiler")
+        self.check_profiler.stateChanged.connect(self.toggle_profiler)
+        cam_layout.addRow(self.check_profiler)
+        
+        self.save_settings_button = QPushButton("Save Settings...")
+        self.save_settings_button.clicked.connect(self.save_settings)
+        cam_layout.addRow(self.save_settings_button)
+        
         cam_group.setLayout(cam_layout)
         controls_layout.addWidget(cam_group)
 
@@ -107,6 +139,13 @@ class ArtCamWindow(QMainWindow):
         self.image_label.setMinimumSize(640, 480)
         self.image_label.setStyleSheet("background-color: black; color: white;")
         main_layout.addWidget(self.image_label, 3)
+        
+        # Per-stage timings, hidden until enabled
+        self.profiler_label = QLabel()
+        self.profiler_label.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
+        self.profiler_label.setStyleSheet("background-color: black; color: #0f0; font-family: monospace;")
+        self.profiler_label.setVisible(False)
+        main_layout.addWidget(self.profiler_label, 1)
 
         if cameras:
             self.change_camera(0)
@@ -127,16 +166,54 @@ class ArtCamWindow(QMainWindow):
     def set_pipeline(self, name):
         self.processor.settings["pipeline"] = name
 
+    def save_settings(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save Settings", "artcam_settings.json", "JSON (*.json)")
+        if path:
+            self.processor.save_settings(path)
+
     def toggle_vcam(self, state):
         if state == Qt.CheckState.Checked.value:
             # Try to start with current frame size
-            frame = self.camera_manager.get_frame()
-            h, w = frame.shape[:2]
-            if not self.virtual_cam.start(w, h):
+            w, h = self.frame_size
+            if self.virtual_cam.start(w, h):
+                self.vcam_enabled = True
+            else:
                 self.check_vcam.setChecked(False)
         else:
+            self.vcam_enabled = False
             self.virtual_cam.stop()
 
+    def toggle_frame_bus(self, state):
+        if state == Qt.CheckState.Checked.value:
+            try:
+                self.frame_bus = FrameBusWriter()
+                print(f"Publishing frames to shared memory: {self.frame_bus.name}")
+            except Exception as e:
+                print(f"Failed to start frame bus: {e}")
+                self.check_frame_bus.setChecked(False)
+        elif self.frame_bus is not None:
+            bus, self.frame_bus = self.frame_bus, None
+            bus.close()
+
+    def toggle_profiler(self, state):
+        self.profiler_label.setVisible(state == Qt.CheckState.Checked.value)
+
+    def update_profiler(self):
+        if not self.profiler_label.isVisible():
+            return
+        stats = self.pipeline.stats()
+        header = (f"processed {stats['processed']}  "
+                  f"dropped {stats['display_dropped']}/{stats['output_dropped']}  (ms)\n")
+        if self.vcam_enabled:
+            vcam = self.virtual_cam.stats()
+            header += f"vcam sent {vcam['delivered']}  dropped {vcam['dropped']}\n"
+        backend = self.processor.backend
+        moved = backend.frame_transfers()
+        header += (f"opencl {'on' if backend.opencl else 'off'}  "
+                   f"uploads {moved['uploads']}  downloads {moved['downloads']} per frame\n")
+        header += "\n"
+        self.profiler_label.setText(header + self.processor.profiler.format_table(20))
+
     def update_settings(self):
         s = self.processor.settings
         s["invert"] = self.check_invert.isChecked()
@@ -152,6 +229,9 @@ class ArtCamWindow(QMainWindow):
         s["glitch_jitter"] = self.slider_jitter.value()
         s["glitch_block_shift"] = self.slider_block.value()
         s["vhs_noise"] = self.slider_vhs.value()
+        s["pixel_sort"] = self.slider_pixel_sort.value()
+        s["sort_key"] = self.sort_key_combo.currentText()
+        s["sort_axis"] = self.sort_axis_combo.currentText()
         
         s["optical_mode"] = self.opt_combo.currentText()
         s["optical_amount"] = self.slider_opt_amt.value()
@@ -165,6 +245,10 @@ class ArtCamWindow(QMainWindow):
         s["ghosting"] = self.slider_ghost.value()
         s["halftone_mode"] = self.halftone_combo.currentText()
         s["geometry_mode"] = self.geom_combo.currentText()
+        s["halftone_cell"] = self.slider_halftone_cell.value()
+        s["mosaic_cell"] = self.slider_mosaic_cell.value()
+        s["ascii_cell"] = self.slider_ascii_cell.value()
+        s["ascii_charset"] = self.ascii_charset_combo.currentText()
         s["texture_mode"] = self.texture_combo.currentText()
         
         s["time_smear"] = self.slider_time_smear.value()
@@ -176,6 +260,7 @@ class ArtCamWindow(QMainWindow):
         s["temp_feedback"] = self.slider_temp_feedback.value()
         s["time_jitter"] = self.slider_time_jitter.value()
         s["slit_scan"] = self.slider_slit_scan.value()
+        s["slit_scan_angle"] = self.slider_slit_scan_angle.value()
         s["temp_quantize"] = self.slider_temp_quantize.value()
         
         s["color_collapse"] = self.slider_color_collapse.value()
@@ -256,13 +341,19 @@ class ArtCamWindow(QMainWindow):
         s["gpu_radial_blur"] = self.slider_gpu_radial_blur.value()
         s["gpu_infrared"] = self.slider_gpu_infrared.value()
 
-    def update_frame(self):
-        frame = self.camera_manager.get_frame()
-        if frame is not None:
-            processed = self.processor.process(frame)
-            self.display_image(processed)
-            if self.check_vcam.isChecked():
-                self.virtual_cam.send_frame(processed)
+    def update_frame(self, processed):
+        # Runs on the GUI thread for each frame the worker delivers
+        self.frame_size = (processed.shape[1], processed.shape[0])
+        self.display_image(processed)
+        self.pipeline.display_done()
+
+    def send_outputs(self, processed):
+        # Runs on the pipeline's output thread
+        if self.vcam_enabled:
+            self.virtual_cam.send_frame(processed)
+        bus = self.frame_bus
+        if bus is not None:
+            bus.publish(processed)
 
     def display_image(self, img):
         qformat = QImage.Format.Format_RGB888
@@ -274,6 +365,10 @@ class ArtCamWindow(QMainWindow):
             self.image_label.size(), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))
 
     def closeEvent(self, event):
+        self.profiler_timer.stop()
+        self.pipeline.stop()
         self.camera_manager.release()
         self.virtual_cam.stop()
+        if self.frame_bus is not None:
+            self.frame_bus.close()
         super().closeEvent(event)
\ No newline at end of file
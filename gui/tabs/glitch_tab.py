@@ -1,5 +1,7 @@
 from PyQt6.QtWidgets import QWidget, QFormLayout, QComboBox
 
+from filters.pixel_sort import SORT_AXES, SORT_KEYS
+
 def create_glitch_tab(parent):
     tab = QWidget()
     layout = QFormLayout(tab)
@@ -16,6 +18,19 @@ def create_glitch_tab(parent):
     parent.slider_vhs = parent.create_slider(0, 100, 0)
     layout.addRow("VHS Noise", parent.slider_vhs)
     
+    parent.slider_pixel_sort = parent.create_slider(0, 100, 0)
+    layout.addRow("Pixel Sort", parent.slider_pixel_sort)
+    
+    parent.sort_key_combo = QComboBox()
+    parent.sort_key_combo.addItems(list(SORT_KEYS))
+    parent.sort_key_combo.currentTextChanged.connect(parent.update_settings)
+    layout.addRow("Sort Key", parent.sort_key_combo)
+    
+    parent.sort_axis_combo = QComboBox()
+    parent.sort_axis_combo.addItems(list(SORT_AXES))
+    parent.sort_axis_combo.currentTextChanged.connect(parent.update_settings)
+    layout.addRow("Sort Axis", parent.sort_axis_combo)
+    
     parent.opt_combo = QComboBox()
     parent.opt_combo.addItems(["None", "Kaleidoscope", "Swirl", "Mirror Tiles"])
     parent.opt_combo.currentTextChanged.connect(parent.update_settings)
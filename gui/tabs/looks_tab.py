@@ -1,11 +1,13 @@
 from PyQt6.QtWidgets import QWidget, QFormLayout, QComboBox
 
+from filters.color_lut import cube_looks
+
 def create_looks_tab(parent):
     tab = QWidget()
     layout = QFormLayout(tab)
     
     parent.look_combo = QComboBox()
-    parent.look_combo.addItems(["None", "Sepia", "Cyberpunk", "Duotone"])
+    parent.look_combo.addItems(["None", "Sepia", "Cyberpunk", "Duotone"] + list(cube_looks()))
     parent.look_combo.currentTextChanged.connect(parent.update_settings)
     layout.addRow("Look", parent.look_combo)
     
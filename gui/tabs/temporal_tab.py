@@ -1,10 +1,12 @@
 from PyQt6.QtWidgets import QWidget, QFormLayout, QComboBox
 
+from filters.cell_render import ASCII_CHARSETS
+
 def create_temporal_tab(parent):
     tab = QWidget()
     layout = QFormLayout(tab)
     
-    parent.slider_trail = parent.create_slider(0, 10, 0)
+    parent.slider_trail = parent.create_slider(0, 60, 0)
     layout.addRow("Motion Trail", parent.slider_trail)
     
     parent.slider_ghost = parent.create_slider(0, 1, 0)
@@ -15,11 +17,25 @@ def create_temporal_tab(parent):
     parent.halftone_combo.currentTextChanged.connect(parent.update_settings)
     layout.addRow("Halftone", parent.halftone_combo)
     
+    parent.slider_halftone_cell = parent.create_slider(4, 40, 10)
+    layout.addRow("Dot Cell", parent.slider_halftone_cell)
+    
     parent.geom_combo = QComboBox()
     parent.geom_combo.addItems(["None", "Mosaic", "ASCII"])
     parent.geom_combo.currentTextChanged.connect(parent.update_settings)
     layout.addRow("Geometry", parent.geom_combo)
     
+    parent.slider_mosaic_cell = parent.create_slider(4, 80, 20)
+    layout.addRow("Mosaic Cell", parent.slider_mosaic_cell)
+    
+    parent.slider_ascii_cell = parent.create_slider(6, 40, 10)
+    layout.addRow("ASCII Cell", parent.slider_ascii_cell)
+    
+    parent.ascii_charset_combo = QComboBox()
+    parent.ascii_charset_combo.addItems(list(ASCII_CHARSETS))
+    parent.ascii_charset_combo.currentTextChanged.connect(parent.update_settings)
+    layout.addRow("ASCII Charset", parent.ascii_charset_combo)
+    
     parent.texture_combo = QComboBox()
     parent.texture_combo.addItems(["None", "Oil", "Watercolor"])
     parent.texture_combo.currentTextChanged.connect(parent.update_settings)
@@ -31,6 +31,9 @@ def create_time_abuse_tab(parent):
     parent.slider_slit_scan = parent.create_slider(0, 1, 0)
     layout.addRow("Slit-Scan", parent.slider_slit_scan)
     
+    parent.slider_slit_scan_angle = parent.create_slider(0, 359, 0)
+    layout.addRow("Slit-Scan Angle", parent.slider_slit_scan_angle)
+    
     parent.slider_temp_quantize = parent.create_slider(0, 60, 0)
     layout.addRow("Temp Quantize", parent.slider_temp_quantize)
     
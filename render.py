@@ -0,0 +1,172 @@
+import argparse
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+from filters import ImageProcessor
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp")
+VIDEO_CODECS = {".mp4": "mp4v", ".mov": "mp4v", ".avi": "MJPG", ".mkv": "XVID"}
+
+def read_frames(path):
+    if os.path.isdir(path):
+        names = sorted(n for n in os.listdir(path) if n.lower().endswith(IMAGE_EXTENSIONS))
+        for name in names:
+            frame = cv2.imread(os.path.join(path, name), cv2.IMREAD_COLOR)
+            if frame is not None:
+                yield frame
+        return
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open input: {path}")
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame
+    finally:
+        cap.release()
+
+def input_fps(path):
+    if os.path.isdir(path):
+        return None
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    cap.release()
+    return fps if fps > 0 else None
+
+def read_ahead(frames, depth):
+    """Decode on a background thread, keeping up to depth frames ready."""
+    q = queue.Queue(maxsize=depth)
+    done = object()
+    errors = []
+
+    def reader():
+        try:
+            for frame in frames:
+                q.put(frame)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            q.put(done)
+
+    threading.Thread(target=reader, name="decode", daemon=True).start()
+    while True:
+        frame = q.get()
+        if frame is done:
+            break
+        yield frame
+    if errors:
+        raise errors[0]
+
+class FrameWriter:
+    def __init__(self, path, fps):
+        self.path = path
+        self.fps = fps
+        self.writer = None
+        self.count = 0
+        ext = os.path.splitext(path)[1].lower()
+        self.codec = VIDEO_CODECS.get(ext)
+        if self.codec is None:
+            os.makedirs(path, exist_ok=True)
+
+    def write(self, frame):
+        if self.codec is None:
+            cv2.imwrite(os.path.join(self.path, f"frame_{self.count:06d}.png"), frame)
+        else:
+            if self.writer is None:
+                h, w = frame.shape[:2]
+                fourcc = cv2.VideoWriter_fourcc(*self.codec)
+                self.writer = cv2.VideoWriter(self.path, fourcc, self.fps, (w, h))
+                if not self.writer.isOpened():
+                    raise IOError(f"Cannot open output: {self.path}")
+            self.writer.write(frame)
+        self.count += 1
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+
+# Process-pool workers each own an ImageProcessor with the same settings
+_worker_processor = None
+
+def _init_worker(settings, seed):
+    global _worker_processor
+    _worker_processor = ImageProcessor()
+    _worker_processor.settings.update(settings)
+    _worker_processor.noise.seed(seed)
+    # The pool already uses every core, tiling inside a worker would oversubscribe
+    _worker_processor.tiles.workers = 1
+
+def _process_in_worker(index, frame):
+    _worker_processor.noise.seed_frame(index)
+    return _worker_processor.process(frame)
+
+def render_parallel(frames, writer, settings, workers, seed=None):
+    # Keep a bounded number of frames in flight and write them back in order
+    pending = deque()
+    # Spawned rather than forked: the decode thread is already running
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=(settings, seed)) as pool:
+        for index, frame in enumerate(frames):
+            pending.append(pool.submit(_process_in_worker, index, frame))
+            if len(pending) >= workers * 2:
+                writer.write(pending.popleft().result())
+        while pending:
+            writer.write(pending.popleft().result())
+
+def render_sequential(frames, writer, processor):
+    for index, frame in enumerate(frames):
+        processor.noise.seed_frame(index)
+        writer.write(processor.process(frame))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a video file or image directory through the ArtCam filters.")
+    parser.add_argument("input", help="video file or directory of images")
+    parser.add_argument("output", help="output video file (.mp4, .mov, .avi, .mkv) or directory for PNG frames")
+    parser.add_argument("-s", "--settings", help="settings JSON saved from ArtCam")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="process pool size for chains without temporal state")
+    parser.add_argument("--fps", type=float, help="output frame rate (default: input rate or 30)")
+    parser.add_argument("--read-ahead", type=int, default=8, help="frames decoded ahead of the sequential path")
+    parser.add_argument("--seed", type=int, help="seed the random effects so the render is reproducible")
+    args = parser.parse_args(argv)
+
+    processor = ImageProcessor()
+    if args.settings:
+        processor.load_settings(args.settings)
+    processor.noise.seed(args.seed)
+    plan = processor.get_plan()
+
+    fps = args.fps or input_fps(args.input) or 30.0
+    writer = FrameWriter(args.output, fps)
+    frames = read_ahead(read_frames(args.input), args.read_ahead)
+
+    start = time.perf_counter()
+    try:
+        if plan.stateful or args.workers <= 1:
+            mode = "sequential"
+            render_sequential(frames, writer, processor)
+        else:
+            mode = f"{args.workers} workers"
+            render_parallel(frames, writer, processor.settings, args.workers, args.seed)
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+
+    rate = writer.count / elapsed if elapsed > 0 else 0.0
+    print(f"Rendered {writer.count} frames ({mode}) in {elapsed:.1f}s, {rate:.1f} fps "
+          f"({rate / fps:.1f}x real time)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,15 @@
+import numpy as np
+
+from filters import ImageProcessor
+
+def test_device_stages_share_one_round_trip():
+    processor = ImageProcessor()
+    processor.backend.set_opencl(False)
+    processor.settings.update({"gpu_blur": 2, "optical_mode": "Swirl", "optical_amount": 30,
+                               "contrast": 1.3, "blur": 2})
+    frame = np.random.default_rng(0).integers(0, 256, (120, 160, 3), dtype=np.uint8)
+    for _ in range(3):
+        out = processor.process(frame)
+        assert processor.backend.frame_transfers() == {"uploads": 1, "downloads": 1}
+    assert out.shape == frame.shape and out.dtype == np.uint8
+    assert processor.backend.transfers() == {"uploads": 3, "downloads": 3}
@@ -0,0 +1,142 @@
+import cv2
+import numpy as np
+import pytest
+
+from filters import ImageProcessor, color_lut
+from filters.color_lut import ColorChain
+from filters.profiler import StageProfiler
+
+# The colour effects as they were written before they moved onto ColorChain
+
+def _invert(img):
+    return cv2.bitwise_not(img)
+
+def _contrast(img, contrast=1.3, saturation=1.4):
+    hls = cv2.cvtColor(img, cv2.COLOR_BGR2HLS).astype(np.float32)
+    hls[:, :, 1] *= contrast
+    hls[:, :, 2] *= saturation
+    hls = np.clip(hls, 0, 255).astype(np.uint8)
+    return cv2.cvtColor(hls, cv2.COLOR_HLS2BGR)
+
+def _sepia(img):
+    kernel = np.array([[0.272, 0.534, 0.131],
+                       [0.349, 0.686, 0.168],
+                       [0.393, 0.769, 0.189]])
+    return cv2.transform(img, kernel)
+
+def _cyberpunk(img):
+    hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV).astype(np.float32)
+    hsv[:, :, 1] *= 1.5
+    img = cv2.cvtColor(hsv.astype(np.uint8), cv2.COLOR_HSV2BGR)
+    b, g, r = cv2.split(img)
+    return cv2.merge([cv2.add(b, 30), g, cv2.add(r, 50)])
+
+def _color_collapse(img, value=50):
+    alpha = value / 100.0
+    collapse = np.full((3, 3), alpha / 3.0, dtype=np.float32) + np.eye(3, dtype=np.float32) * (1.0 - alpha)
+    return cv2.transform(img, collapse)
+
+def _hue_shatter(img, shards=12):
+    h_chan, s, v = cv2.split(cv2.cvtColor(img, cv2.COLOR_BGR2HSV))
+    h_chan = (h_chan // (180 // shards)) * (180 // shards)
+    return cv2.cvtColor(cv2.merge([h_chan, s, v]), cv2.COLOR_HSV2BGR)
+
+def _palette_decay(img, value=50):
+    div = max(1, 256 // (256 - value * 2))
+    return (img // div) * div
+
+def _solarize_hell(img, value=50):
+    img = img.copy()
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    _, mask = cv2.threshold(gray, 255 - value * 2, 255, cv2.THRESH_BINARY)
+    img[mask > 0] = 255 - img[mask > 0]
+    return img
+
+def _chromatic_meltdown(img, value=20):
+    hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV).astype(np.float32)
+    hsv[:, :, 1] *= (1.0 + value / 10.0)
+    hsv[:, :, 1] = np.clip(hsv[:, :, 1], 0, 255)
+    return cv2.cvtColor(hsv.astype(np.uint8), cv2.COLOR_HSV2BGR)
+
+def _hue_feedback(img, offset=10):
+    h_chan, s, v = cv2.split(cv2.cvtColor(img, cv2.COLOR_BGR2HSV))
+    h_chan = (h_chan.astype(np.int16) + offset) % 180
+    return cv2.cvtColor(cv2.merge([h_chan.astype(np.uint8), s, v]), cv2.COLOR_HSV2BGR)
+
+def _dead_green(img):
+    img = img.copy()
+    img[:, :, 1] = 0
+    return img
+
+def _impossible_colors(img):
+    lab = cv2.cvtColor(img, cv2.COLOR_BGR2LAB).astype(np.float32)
+    lab[:, :, 1] = 255 - lab[:, :, 1]
+    lab[:, :, 2] = 255 - lab[:, :, 2]
+    return cv2.cvtColor(lab.astype(np.uint8), cv2.COLOR_LAB2BGR)
+
+def _gpu_punch(img):
+    return cv2.add(cv2.multiply(cv2.multiply(img, 1.5), 1.5), 20)
+
+def _gpu_posterize(img):
+    return cv2.multiply(cv2.divide(img, 64), 64)
+
+def _gpu_solarize(img):
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    _, mask = cv2.threshold(gray, 128, 255, cv2.THRESH_BINARY)
+    inverted = cv2.bitwise_not(img)
+    mask_3ch = cv2.merge([mask, mask, mask])
+    img = cv2.bitwise_and(img, cv2.bitwise_not(mask_3ch))
+    return cv2.bitwise_or(img, cv2.bitwise_and(inverted, mask_3ch))
+
+CASES = [
+    ({"invert": True}, [_invert]),
+    ({"contrast": 1.3, "saturation": 1.4}, [_contrast]),
+    ({"invert": True, "contrast": 1.3, "saturation": 1.4}, [_invert, _contrast]),
+    ({"look_mode": "Sepia"}, [_sepia]),
+    ({"look_mode": "Cyberpunk"}, [_cyberpunk]),
+    ({"color_collapse": 50}, [_color_collapse]),
+    ({"hue_shatter": 12}, [_hue_shatter]),
+    ({"palette_decay": 50}, [_palette_decay]),
+    ({"solarize_hell": 50}, [_solarize_hell]),
+    ({"chromatic_meltdown": 20}, [_chromatic_meltdown]),
+    ({"hue_feedback": 10}, [_hue_feedback]),
+    ({"dead_channel": "Green"}, [_dead_green]),
+    ({"color_collapse": 50, "hue_shatter": 12, "palette_decay": 50, "solarize_hell": 50,
+      "chromatic_meltdown": 20, "hue_feedback": 10, "dead_channel": "Green"},
+     [_color_collapse, _hue_shatter, _palette_decay, _solarize_hell,
+      _chromatic_meltdown, _hue_feedback, _dead_green]),
+    ({"impossible_colors": 5}, [_impossible_colors]),
+    ({"gpu_punch": 5}, [_gpu_punch]),
+    ({"gpu_posterize": 5}, [_gpu_posterize]),
+    ({"gpu_solarize": 5}, [_gpu_solarize]),
+    ({"gpu_punch": 5, "gpu_posterize": 5, "gpu_solarize": 5}, [_gpu_punch, _gpu_posterize, _gpu_solarize]),
+]
+
+def _image():
+    return np.random.default_rng(0).integers(0, 256, (120, 160, 3), dtype=np.uint8)
+
+@pytest.mark.parametrize("settings,effects", CASES, ids=[str(c[0]) for c in CASES])
+def test_effects_match_their_old_passes(settings, effects):
+    processor = ImageProcessor()
+    processor.backend.set_opencl(False)
+    processor.settings.update(settings)
+    frame = _image()
+    expected = frame
+    for effect in effects:
+        expected = effect(expected)
+    assert np.array_equal(processor.process(frame), expected)
+
+def test_missing_cube_is_skipped(tmp_path):
+    chain = ColorChain(StageProfiler())
+    color_lut.add_cube(chain, "Gone", str(tmp_path / "gone.cube"))
+    assert chain.ops == []
+
+def test_identity_cube_moves_colours_by_at_most_half_a_level(tmp_path):
+    path = tmp_path / "identity.cube"
+    rows = [f"{r} {g} {b}" for b in (0, 1) for g in (0, 1) for r in (0, 1)]
+    path.write_text("LUT_3D_SIZE 2\n" + "\n".join(rows) + "\n")
+    chain = ColorChain(StageProfiler())
+    color_lut.add_cube(chain, "Identity", str(path))
+    frame = _image()
+    diff = np.abs(chain.apply(frame).astype(int) - frame)
+    assert diff.max() <= 1
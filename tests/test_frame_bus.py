@@ -0,0 +1,61 @@
+import os
+import struct
+import subprocess
+import sys
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pytest
+
+import frame_bus
+from frame_bus import FrameBusReader, FrameBusWriter
+
+def _name():
+    return f"artcam_test_{os.getpid()}"
+
+def _leave_segment(name, header=None):
+    # A writer that crashed leaves its segment behind without cleanup
+    shm = shared_memory.SharedMemory(name=name, create=True, size=64)
+    resource_tracker.unregister(shm._name, "shared_memory")
+    if header is not None:
+        shm.buf[:len(header)] = header
+    shm.close()
+
+def _round_trip(writer, name):
+    reader = FrameBusReader(name)
+    frame = np.arange(8 * 8 * 3, dtype=np.uint8).reshape(8, 8, 3)
+    seq = writer.publish(frame)
+    out, read_seq, _ = reader.read()
+    reader.close()
+    return read_seq == seq and np.array_equal(out, frame)
+
+def test_writer_replaces_a_segment_that_is_not_a_bus():
+    _leave_segment(_name())
+    writer = FrameBusWriter(name=_name(), slots=2, max_shape=(8, 8, 3))
+    try:
+        assert _round_trip(writer, _name())
+    finally:
+        writer.close()
+
+@pytest.mark.skipif(os.name == "nt", reason="Windows frees segments with their last handle")
+def test_writer_replaces_a_bus_whose_writer_is_gone():
+    dead = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                          capture_output=True, text=True).stdout
+    header = bytearray(64)
+    frame_bus.HEADER.pack_into(header, 0, frame_bus.MAGIC, frame_bus.VERSION, 2, 256, 0)
+    struct.pack_into("<Q", header, frame_bus.WRITER_PID_OFFSET, int(dead))
+    _leave_segment(_name(), header)
+    writer = FrameBusWriter(name=_name(), slots=2, max_shape=(8, 8, 3))
+    try:
+        assert _round_trip(writer, _name())
+    finally:
+        writer.close()
+
+def test_live_bus_is_not_taken_over():
+    writer = FrameBusWriter(name=_name(), slots=2, max_shape=(8, 8, 3))
+    try:
+        with pytest.raises(FileExistsError):
+            FrameBusWriter(name=_name(), slots=2, max_shape=(8, 8, 3))
+        assert _round_trip(writer, _name())
+    finally:
+        writer.close()
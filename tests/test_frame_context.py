@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from filters.frame_context import FrameContext
+
+def test_planes_follow_the_bound_frame():
+    ctx = FrameContext()
+    first = np.full((4, 4, 3), 10, dtype=np.uint8)
+    ctx.start(first)
+    ctx.bind(first)
+    assert not ctx.diff().any()
+    gray = ctx.gray()
+    assert ctx.gray() is gray
+
+    second = np.full((4, 4, 3), 50, dtype=np.uint8)
+    ctx.bind(second)
+    assert ctx.gray() is not gray
+    assert (ctx.diff() == 40).all()
+
+def test_device_stages_cannot_use_the_context():
+    ctx = FrameContext()
+    ctx.start(None)
+    ctx.bind(None)
+    with pytest.raises(AssertionError):
+        ctx.gray()
+    with pytest.raises(AssertionError):
+        ctx.has_prev()
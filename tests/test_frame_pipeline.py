@@ -0,0 +1,38 @@
+import time
+
+import numpy as np
+
+from frame_pipeline import FramePipeline
+
+def test_failing_frame_does_not_stop_the_worker():
+    frame = np.zeros((8, 8, 3), dtype=np.uint8)
+    calls = []
+
+    def process(f):
+        calls.append(f)
+        if len(calls) == 1:
+            raise RuntimeError("bad frame")
+        return f
+
+    pipeline = FramePipeline(lambda timeout: frame, process, max_fps=200)
+    pipeline.start()
+    deadline = time.monotonic() + 2.0
+    while pipeline.frames_processed < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    pipeline.stop()
+    assert pipeline.stats()["process_errors"] == 1
+    assert pipeline.frames_processed >= 3
+
+def test_repeated_failure_is_reported_once_and_paced(capsys):
+    frame = np.zeros((8, 8, 3), dtype=np.uint8)
+
+    def process(f):
+        raise ValueError("broken setting")
+
+    pipeline = FramePipeline(lambda timeout: frame, process, max_fps=50)
+    pipeline.start()
+    time.sleep(0.3)
+    pipeline.stop()
+    errors = pipeline.stats()["process_errors"]
+    assert 3 <= errors <= 20
+    assert capsys.readouterr().out.count("Frame processing failed") == 1
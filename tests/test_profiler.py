@@ -0,0 +1,20 @@
+import numpy as np
+
+from filters import ImageProcessor
+
+def test_switched_off_effects_leave_the_table():
+    processor = ImageProcessor()
+    processor.settings.update({"vignette": 50, "bloom": 50})
+    frame = np.full((120, 160, 3), 200, dtype=np.uint8)
+    for _ in range(3):
+        processor.process(frame)
+    assert {"light", "light.vignette", "light.bloom"} <= set(processor.profiler.stats())
+
+    processor.settings["bloom"] = 0
+    processor.process(frame)
+    names = set(processor.profiler.stats())
+    assert "light.vignette" in names and "light.bloom" not in names
+
+    processor.settings["vignette"] = 0
+    processor.process(frame)
+    assert set(processor.profiler.stats()) == {"total"}
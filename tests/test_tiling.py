@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from filters import basic_filters
+from filters.tiling import TileScheduler
+
+TILED = [
+    (basic_filters._comic_color, basic_filters.COMIC_HALO),
+    (basic_filters._pencil, basic_filters.PENCIL_HALO),
+]
+if basic_filters.OIL_TILED:
+    TILED.append((basic_filters._oil, basic_filters.OIL_HALO))
+
+def _frame():
+    rng = np.random.default_rng(0)
+    ramp = np.linspace(0, 255, 640, dtype=np.float32)
+    frame = np.dstack([np.tile(ramp, (360, 1)), np.tile(ramp[::-1], (360, 1)),
+                       np.full((360, 640), 128, np.float32)])
+    frame += rng.normal(0, 20, frame.shape)
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+@pytest.mark.parametrize("fn,halo", TILED, ids=lambda v: getattr(v, "__name__", str(v)))
+def test_tiled_matches_full_frame(fn, halo):
+    frame = _frame()
+    tiled = TileScheduler(workers=6, min_pixels=0).run(fn, frame, halo)
+    diff = np.abs(tiled.astype(np.int16) - fn(frame).astype(np.int16))
+    assert diff.max() <= 1
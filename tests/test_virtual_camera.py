@@ -0,0 +1,56 @@
+import threading
+import time
+
+import numpy as np
+
+from camera_manager import VirtualCameraManager
+
+class FakeCamera:
+    """Stands in for pyvirtualcam.Camera; send() blocks until released."""
+
+    instances = []
+
+    def __init__(self, width, height, fps):
+        self.device = "fake"
+        self.shape = (height, width, 3)
+        self.sent = []
+        self.sending = threading.Event()
+        self.release = threading.Event()
+        self.closed = False
+        FakeCamera.instances.append(self)
+
+    def send(self, frame):
+        assert frame.shape == self.shape
+        self.sending.set()
+        self.release.wait(2.0)
+        self.sent.append(frame.copy())
+
+    def sleep_until_next_frame(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+class FakeBackend:
+    Camera = FakeCamera
+
+def test_frames_waiting_on_a_busy_camera_are_dropped():
+    vcam = VirtualCameraManager(backend=FakeBackend)
+    assert vcam.start(64, 48)
+    cam = FakeCamera.instances[-1]
+    frames = [np.full((96, 128, 3), i, dtype=np.uint8) for i in range(4)]
+
+    vcam.send_frame(frames[0])
+    assert cam.sending.wait(2.0)
+    for frame in frames[1:]:
+        vcam.send_frame(frame)
+    cam.release.set()
+
+    deadline = time.monotonic() + 2.0
+    while vcam.frames_delivered < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    vcam.stop()
+
+    assert vcam.stats() == {"delivered": 2, "dropped": 2, "send_failures": 0}
+    assert [int(f[0, 0, 0]) for f in cam.sent] == [0, 3]
+    assert cam.closed